@@ -3,17 +3,25 @@ __author__ = "CoinDCX Futures Trading System"
 
 from app.scanner import PriceScanner
 from app.indicators import TechnicalIndicators
+from app.indicator_registry import register_indicator, register_intermediate
 from app.signal_generator import SignalGenerator
 from app.risk_manager import RiskManager
 from app.account_manager import AccountManager
 from app.alerter import Alerter
+from app.alert_channels import AlertChannel, register_channel
+from app.universe import CoinUniverse
 
 __all__ = [
     'PriceScanner',
     'TechnicalIndicators',
+    'register_indicator',
+    'register_intermediate',
     'SignalGenerator',
     'RiskManager',
     'AccountManager',
-    'Alerter'
+    'Alerter',
+    'AlertChannel',
+    'register_channel',
+    'CoinUniverse'
 ]
 
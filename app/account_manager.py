@@ -4,8 +4,12 @@ import hashlib
 import json
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
+from app.http_client import create_session, get_timeouts
+from app.margin_ledger import MarginLedger
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +19,30 @@ class AccountManager:
         self.api_key = api_key
         self.api_secret = api_secret
         self.api_endpoint = config['personalized']['api_endpoint']
-        self.timeout = config['performance']['api_timeout_seconds']
+        self.timeout = get_timeouts(config)
+        
+        self._signer = hmac.new(api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+        self.session = create_session(pool_size=2, headers={
+            'Content-Type': 'application/json',
+            'X-AUTH-APIKEY': api_key
+        })
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="account-fetch")
+        self.last_refresh_ms = None
         
         self.account_balance = {}
         self.open_positions = []
         self.last_refresh = None
         
+        self.refresh_interval = config['personalized'].get('refresh_interval_seconds', 30)
+        self.snapshot_time = None
+        self.stale = True
+        self.refresh_count = 0
+        self.ledger = MarginLedger(ttl_seconds=config['personalized'].get('reservation_ttl_seconds', 120))
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._refresher = None
+        
     def _generate_signature(self, secret: str, payload: str) -> str:
         signature = hmac.new(
             secret.encode('utf-8'),
@@ -31,18 +53,13 @@ class AccountManager:
     
     def _make_authenticated_request(self, endpoint: str, payload: Dict) -> Optional[Dict]:
         try:
-            secret_bytes = bytes(self.api_secret, encoding='utf-8')
-            payload_json = json.dumps(payload, separators=(',', ':'))
-            signature = hmac.new(secret_bytes, payload_json.encode(), hashlib.sha256).hexdigest()
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'X-AUTH-APIKEY': self.api_key,
-                'X-AUTH-SIGNATURE': signature
-            }
+            payload_json = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            signer = self._signer.copy()
+            signer.update(payload_json)
+            headers = {'X-AUTH-SIGNATURE': signer.hexdigest()}
             
             url = f"{self.api_endpoint}{endpoint}"
-            response = requests.post(url, data=payload_json, headers=headers, timeout=self.timeout)
+            response = self.session.post(url, data=payload_json, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             
             return response.json()
@@ -111,25 +128,49 @@ class AccountManager:
             position = {
                 'symbol': order.get('market', '').replace('INR', ''),
                 'side': order.get('side', ''),
+                'direction': 'SHORT' if order.get('side', '').lower() == 'sell' else 'LONG',
                 'entry_price': float(order.get('price', 0)),
                 'quantity': float(order.get('total_quantity', 0)),
                 'filled_quantity': float(order.get('filled_quantity', 0)),
                 'order_id': order.get('id', ''),
-                'status': order.get('status', '')
+                'status': order.get('status', ''),
+                'created_at': self._parse_order_time(order.get('created_at'))
             }
             positions.append(position)
         
         return positions
     
+    @staticmethod
+    def _parse_order_time(value) -> Optional[float]:
+        # Epoch milliseconds or ISO-8601; None when the order carries no usable timestamp.
+        if value in (None, ''):
+            return None
+        try:
+            return float(value) / 1000
+        except (TypeError, ValueError):
+            pass
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    
     def get_available_margin(self) -> float:
+        # Never fetch inline: until the refresher fills the snapshot, no margin is available.
         if not self.account_balance:
-            self.fetch_account_balance()
+            self._wake.set()
         
-        return self.account_balance.get('available_margin', 0)
+        return self.ledger.available(self.account_balance.get('available_margin', 0))
+    
+    def reserve_margin(self, symbol: str, direction: str, amount: float):
+        self.ledger.reserve(symbol, direction, amount)
+        logger.info(f"Reserved ₹{amount:.2f} margin for {symbol} {direction} (₹{self.ledger.reserved:.2f} reserved in total)")
+    
+    def release_margin(self, symbol: str, direction: str):
+        self.ledger.release(symbol, direction)
     
     def get_used_margin(self) -> float:
         if not self.account_balance:
-            self.fetch_account_balance()
+            self._wake.set()
         
         return self.account_balance.get('used_margin', 0)
     
@@ -151,7 +192,7 @@ class AccountManager:
             return False, f"Insufficient margin. Required: ₹{position_size}, Available: ₹{available_margin}"
         
         max_positions = self.config['risk']['max_concurrent_positions']
-        if len(self.open_positions) >= max_positions:
+        if len(self.open_positions) + self.ledger.count >= max_positions:
             return False, f"Max concurrent positions reached ({max_positions})"
         
         return True, "OK"
@@ -186,15 +227,85 @@ class AccountManager:
         
         return {
             'total_balance': self.account_balance.get('total_balance', 0),
-            'available_margin': self.account_balance.get('available_margin', 0),
+            'available_margin': self.ledger.available(self.account_balance.get('available_margin', 0)),
             'used_margin': self.account_balance.get('used_margin', 0),
-            'open_positions_count': len(self.open_positions),
+            'reserved_margin': self.ledger.reserved,
+            'open_positions_count': len(self.open_positions) + self.ledger.count,
             'positions': positions_summary,
             'total_pnl': total_pnl
         }
     
     def refresh_account_data(self):
-        self.fetch_account_balance()
-        self.fetch_open_positions()
-        logger.info("Account data refreshed")
+        self._refresh_snapshot()
+        logger.info(f"Account data refreshed in {self.last_refresh_ms:.0f}ms")
+    
+    def _refresh_snapshot(self) -> bool:
+        with self._refresh_lock:
+            self.stale = False
+            started = time.perf_counter()
+            balance_request = self._executor.submit(self.fetch_account_balance)
+            positions_request = self._executor.submit(self.fetch_open_positions)
+            balance = balance_request.result()
+            positions_request.result()
+            self.last_refresh_ms = (time.perf_counter() - started) * 1000
+            if balance is None:
+                self.stale = True
+                return False
+            self.snapshot_time = time.monotonic()
+            self.refresh_count += 1
+            self.ledger.reconcile(
+                (position['symbol'], position['direction'], position['created_at'])
+                for position in self.open_positions
+            )
+            return True
+    
+    @property
+    def snapshot_age(self) -> Optional[float]:
+        if self.snapshot_time is None:
+            return None
+        return time.monotonic() - self.snapshot_time
+    
+    def is_snapshot_fresh(self) -> bool:
+        age = self.snapshot_age
+        return not self.stale and age is not None and age < self.refresh_interval
+    
+    def ensure_snapshot(self):
+        if self.snapshot_time is None:
+            self._refresh_snapshot()
+        elif not self.is_snapshot_fresh() and not self.background_refresh_running:
+            self._refresh_snapshot()
+    
+    def invalidate(self):
+        self.stale = True
+        self._wake.set()
+    
+    @property
+    def background_refresh_running(self) -> bool:
+        return self._refresher is not None and self._refresher.is_alive()
+    
+    def start_background_refresh(self):
+        if self.background_refresh_running:
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="account-refresh", daemon=True)
+        self._refresher.start()
+        logger.info(f"Account snapshot refreshing every {self.refresh_interval}s in the background")
+    
+    def stop_background_refresh(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._refresher:
+            self._refresher.join(timeout)
+    
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                if self._refresh_snapshot():
+                    logger.debug("Account snapshot refreshed in background")
+                else:
+                    logger.warning("Background account refresh failed, keeping previous snapshot")
+            except Exception as e:
+                logger.error(f"Error refreshing account snapshot: {e}")
+            self._wake.wait(self.refresh_interval)
 
@@ -0,0 +1,204 @@
+import time
+import logging
+import threading
+import requests
+from typing import Dict, List, Optional, Tuple
+from app.http_client import create_session
+from app.rate_limiter import TokenBucket
+from app.utils import get_env_var
+
+logger = logging.getLogger(__name__)
+
+class AlertChannel:
+    # Subclasses set the platform limits and implement configure() and build_request().
+    name = "channel"
+    max_chars = 2000
+    max_items: Optional[int] = None
+    max_item_chars: Optional[int] = None
+    separator = ""
+    requests_per_minute = 30
+    burst = 5
+
+    def __init__(self, channel_config: Dict, max_retries: int = 5, timeout: float = 10):
+        self.channel_config = channel_config
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.enabled = self.configure(channel_config)
+
+        limits = channel_config.get('rate_limit', {})
+        self.bucket = TokenBucket(
+            limits.get('requests_per_minute', self.requests_per_minute) / 60,
+            limits.get('burst', self.burst),
+            name=self.name.capitalize()
+        )
+        self.session = create_session(pool_size=2, headers={'Content-Type': 'application/json'})
+
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def configure(self, channel_config: Dict) -> bool:
+        raise NotImplementedError
+
+    def build_request(self, messages: List[str]) -> Tuple[str, Dict]:
+        raise NotImplementedError
+
+    def chunk(self, messages: List[str]) -> List[List[str]]:
+        chunks = []
+        current = []
+        size = 0
+        for message in messages:
+            oversized = self.max_item_chars is not None and len(message) > self.max_item_chars
+            added = len(message) + (len(self.separator) if current else 0)
+            if current and (oversized or size + added > self.max_chars or
+                            (self.max_items and len(current) >= self.max_items)):
+                chunks.append(current)
+                current = []
+                size = 0
+                added = len(message)
+            current.append(message)
+            size += added
+            if oversized:
+                chunks.append(current)
+                current = []
+                size = 0
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def send(self, messages: List[str]) -> bool:
+        started = time.perf_counter()
+        sent = self._post(*self.build_request(messages))
+        latency = time.perf_counter() - started
+
+        with self._lock:
+            if sent:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+        return sent
+
+    def _post(self, url: str, payload: Dict) -> bool:
+        label = self.name.capitalize()
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+                if response.status_code == 429:
+                    retry_after = self._retry_after(response)
+                    self.bucket.defer(retry_after)
+                    logger.warning(f"{label} returned 429 (attempt {attempt + 1}/{self.max_retries + 1}), retrying in {retry_after:.2f}s")
+                    continue
+                response.raise_for_status()
+
+                if response.headers.get('X-RateLimit-Remaining') == '0':
+                    self.bucket.defer(float(response.headers.get('X-RateLimit-Reset-After', 1)))
+                logger.debug(f"{label} alert sent successfully")
+                return True
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Failed to send {label} alert: {e}")
+                return False
+
+        logger.error(f"Failed to send {label} alert: still rate limited after {self.max_retries} retries")
+        return False
+
+    @staticmethod
+    def _retry_after(response) -> float:
+        header = response.headers.get('Retry-After')
+        if header:
+            try:
+                return float(header)
+            except ValueError:
+                pass
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if isinstance(body, dict):
+            retry_after = body.get('retry_after') or body.get('parameters', {}).get('retry_after')
+            if retry_after:
+                return float(retry_after)
+        return 1.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            attempts = self.sent + self.failed
+            return {
+                'sent': self.sent,
+                'failed': self.failed,
+                'success_rate': self.sent / attempts if attempts else 0.0,
+                'avg_latency_ms': self.total_latency / attempts * 1000 if attempts else 0.0,
+                'max_latency_ms': self.max_latency * 1000
+            }
+
+class DiscordChannel(AlertChannel):
+    # Batches go out as embeds (4096 chars each, 6000 per request); plain content is capped at 2000.
+    name = "discord"
+    max_chars = 6000
+    max_items = 10
+    max_item_chars = 4096
+    max_content_chars = 2000
+    requests_per_minute = 30
+    burst = 5
+
+    def configure(self, channel_config: Dict) -> bool:
+        webhook_var = channel_config['webhook_env_var']
+        self.webhook = get_env_var(webhook_var, required=False)
+        if not self.webhook:
+            logger.warning(f"Discord enabled but {webhook_var} not set")
+            return False
+        return True
+
+    def build_request(self, messages: List[str]) -> Tuple[str, Dict]:
+        if len(messages) == 1 and len(messages[0]) <= self.max_content_chars:
+            return self.webhook, {"content": messages[0]}
+        return self.webhook, {"embeds": [{"description": message} for message in messages]}
+
+class TelegramChannel(AlertChannel):
+    name = "telegram"
+    max_chars = 4096
+    separator = "\n\n"
+    requests_per_minute = 20
+    burst = 3
+
+    def configure(self, channel_config: Dict) -> bool:
+        self.token = get_env_var(channel_config['bot_token_env_var'], required=False)
+        self.chat_id = get_env_var(channel_config['chat_id_env_var'], required=False)
+        self.api_base = channel_config.get('api_base', 'https://api.telegram.org').rstrip('/')
+        if not self.token or not self.chat_id:
+            logger.warning("Telegram enabled but credentials not set")
+            return False
+        return True
+
+    def build_request(self, messages: List[str]) -> Tuple[str, Dict]:
+        payload = {
+            "chat_id": self.chat_id,
+            "text": self.separator.join(messages),
+            "parse_mode": "Markdown"
+        }
+        return f"{self.api_base}/bot{self.token}/sendMessage", payload
+
+CHANNEL_TYPES = {
+    'discord': DiscordChannel,
+    'telegram': TelegramChannel
+}
+
+def register_channel(name: str, channel_class: type):
+    CHANNEL_TYPES[name] = channel_class
+
+def build_channels(alert_config: Dict) -> List[AlertChannel]:
+    max_retries = alert_config.get('max_retries', 5)
+    timeout = alert_config.get('timeout_seconds', 10)
+    channels = []
+    for name, channel_class in CHANNEL_TYPES.items():
+        channel_config = alert_config.get(name)
+        if not channel_config or not channel_config.get('enabled', False):
+            continue
+        channel = channel_class(channel_config, max_retries=max_retries, timeout=timeout)
+        if channel.enabled:
+            channels.append(channel)
+    return channels
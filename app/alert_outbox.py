@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    channel TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS alerts_status ON alerts (status, created_at);
+"""
+
+class AlertOutbox:
+    # Writes accumulate in one open transaction; commit() makes them durable (fsync) once per cycle.
+    def __init__(self, path: str, retention_days: float = 7):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+        self._dirty = False
+        self.commits = 0
+
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM alerts WHERE status != 'pending' AND created_at < ?", (cutoff,)
+            ).rowcount
+            self._conn.commit()
+        if removed:
+            logger.info(f"Alert outbox: pruned {removed} entries older than {retention_days} days")
+
+    def record(self, channel: str, alert_type: str, messages: List[str]) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO alerts (created_at, channel, alert_type, payload) VALUES (?, ?, ?, ?)",
+                (time.time(), channel, alert_type, json.dumps(messages))
+            )
+            self._dirty = True
+            return cursor.lastrowid
+
+    def mark(self, alert_id: int, delivered: bool):
+        status = 'delivered' if delivered else 'pending'
+        with self._lock:
+            self._conn.execute(
+                "UPDATE alerts SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (status, time.time(), alert_id)
+            )
+            self._dirty = True
+
+    def commit(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._conn.commit()
+            self._dirty = False
+            self.commits += 1
+
+    def pending(self, max_age_minutes: Optional[float] = None) -> List[Dict]:
+        with self._lock:
+            if max_age_minutes is not None:
+                cutoff = time.time() - max_age_minutes * 60
+                expired = self._conn.execute(
+                    "UPDATE alerts SET status = 'expired', updated_at = ? WHERE status = 'pending' AND created_at < ?",
+                    (time.time(), cutoff)
+                ).rowcount
+                if expired:
+                    self._dirty = True
+                    logger.warning(f"Alert outbox: {expired} undelivered alerts older than {max_age_minutes} minutes expired")
+
+            rows = self._conn.execute(
+                "SELECT id, created_at, channel, alert_type, payload, attempts FROM alerts "
+                "WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+
+        return [
+            {
+                'id': row[0],
+                'created_at': row[1],
+                'channel': row[2],
+                'alert_type': row[3],
+                'messages': json.loads(row[4]),
+                'attempts': row[5]
+            }
+            for row in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM alerts GROUP BY status").fetchall())
+
+    def close(self):
+        self.commit()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,166 @@
+import time
+import queue
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class AlertQueue:
+    # Each channel gets its own lane (bounded queue + workers) so a slow sink never delays the others.
+    # When a lane is full, its oldest pending delivery is dropped so fresh signals still go out.
+    def __init__(self, max_size: int = 100, workers: int = 1):
+        self.max_size = max_size
+        self.workers = max(1, workers)
+        self._lanes: Dict[str, queue.Queue] = {}
+        self._threads: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.channel_stats = defaultdict(lambda: {
+            'sent': 0,
+            'failed': 0,
+            'dropped': 0,
+            'total_latency': 0.0,
+            'max_latency': 0.0,
+            'last_latency': 0.0,
+            'total_send': 0.0
+        })
+
+    @property
+    def depth(self) -> int:
+        return sum(lane.qsize() for lane in list(self._lanes.values()))
+
+    def _lane(self, channel: str) -> queue.Queue:
+        lane = self._lanes.get(channel)
+        if lane is not None:
+            return lane
+        with self._lock:
+            if channel not in self._lanes:
+                lane = queue.Queue(maxsize=self.max_size)
+                threads = [
+                    threading.Thread(target=self._worker, args=(lane,), name=f"alert-{channel}-{i}", daemon=True)
+                    for i in range(self.workers)
+                ]
+                for thread in threads:
+                    thread.start()
+                self._threads[channel] = threads
+                self._lanes[channel] = lane
+            return self._lanes[channel]
+
+    def submit(self, channel: str, send_fn: Callable[[Any], bool], message: Any, alert_type: str = "general") -> bool:
+        if self._closed:
+            logger.warning(f"Alert queue closed, dropping {alert_type} alert for {channel}")
+            return False
+
+        lane = self._lane(channel)
+        job = (channel, send_fn, message, alert_type, time.perf_counter())
+        while True:
+            try:
+                lane.put_nowait(job)
+                break
+            except queue.Full:
+                try:
+                    stale = lane.get_nowait()
+                except queue.Empty:
+                    continue
+                lane.task_done()
+                with self._lock:
+                    self.dropped += 1
+                    self.channel_stats[stale[0]]['dropped'] += 1
+                logger.warning(f"Alert queue for {channel} full ({self.max_size}), dropped oldest {stale[3]} alert")
+
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, lane.qsize())
+        return True
+
+    def _worker(self, lane: queue.Queue):
+        while True:
+            job = lane.get()
+            if job is None:
+                lane.task_done()
+                break
+
+            channel, send_fn, message, alert_type, enqueued_at = job
+            started = time.perf_counter()
+            try:
+                sent = send_fn(message)
+            except Exception as e:
+                logger.error(f"Error delivering {alert_type} alert to {channel}: {e}")
+                sent = False
+            finished = time.perf_counter()
+
+            latency = finished - enqueued_at
+            with self._lock:
+                stats = self.channel_stats[channel]
+                stats['sent' if sent else 'failed'] += 1
+                stats['total_latency'] += latency
+                stats['max_latency'] = max(stats['max_latency'], latency)
+                stats['last_latency'] = latency
+                stats['total_send'] += finished - started
+            lane.task_done()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            channels = {}
+            for channel, stats in self.channel_stats.items():
+                delivered = stats['sent'] + stats['failed']
+                lane = self._lanes.get(channel)
+                channels[channel] = {
+                    'depth': lane.qsize() if lane else 0,
+                    'sent': stats['sent'],
+                    'failed': stats['failed'],
+                    'dropped': stats['dropped'],
+                    'avg_latency_ms': stats['total_latency'] / delivered * 1000 if delivered else 0.0,
+                    'max_latency_ms': stats['max_latency'] * 1000,
+                    'last_latency_ms': stats['last_latency'] * 1000,
+                    'avg_send_ms': stats['total_send'] / delivered * 1000 if delivered else 0.0
+                }
+            return {
+                'depth': sum(lane.qsize() for lane in self._lanes.values()),
+                'max_depth': self.max_depth,
+                'max_size': self.max_size,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'channels': channels
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(f"Alert queue: depth {stats['depth']}/{stats['max_size']} (peak {stats['max_depth']}), "
+                    f"{stats['enqueued']} enqueued, {stats['dropped']} dropped")
+        for channel, channel_stats in stats['channels'].items():
+            logger.info(f"  {channel}: depth {channel_stats['depth']}, {channel_stats['sent']} sent, {channel_stats['failed']} failed, "
+                        f"{channel_stats['dropped']} dropped | latency avg {channel_stats['avg_latency_ms']:.0f}ms "
+                        f"max {channel_stats['max_latency_ms']:.0f}ms | send avg {channel_stats['avg_send_ms']:.0f}ms")
+
+    def close(self, timeout: Optional[float] = None):
+        if self._closed:
+            return
+        self._closed = True
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            lanes = list(self._lanes.items())
+        for channel, lane in lanes:
+            for _ in self._threads[channel]:
+                remaining = max(0.0, deadline - time.monotonic()) if deadline else None
+                try:
+                    lane.put(None, timeout=remaining)
+                except queue.Full:
+                    break
+        for channel, _ in lanes:
+            for thread in self._threads[channel]:
+                remaining = max(0.0, deadline - time.monotonic()) if deadline else None
+                thread.join(remaining)
+
+        pending = 0
+        for _, lane in lanes:
+            with lane.mutex:
+                pending += sum(1 for job in lane.queue if job is not None)
+        if pending:
+            logger.warning(f"Alert queue closed with {pending} undelivered alerts")
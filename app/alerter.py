@@ -1,8 +1,14 @@
-import requests
+import time
 import logging
-from typing import Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Set
 from datetime import datetime
-from app.utils import format_inr, format_percentage, format_price, get_env_var
+from app.alert_channels import build_channels
+from app.alert_queue import AlertQueue
+from app.alert_outbox import AlertOutbox
+from app.utils import format_inr, format_percentage, format_price
 
 logger = logging.getLogger(__name__)
 
@@ -12,24 +18,84 @@ class Alerter:
         self.alert_config = config['alerts']
         self.risk_manager = risk_manager
         
-        self.discord_enabled = self.alert_config['discord']['enabled']
-        self.telegram_enabled = self.alert_config['telegram']['enabled']
-        
-        if self.discord_enabled:
-            webhook_var = self.alert_config['discord']['webhook_env_var']
-            self.discord_webhook = get_env_var(webhook_var, required=False)
-            if not self.discord_webhook:
-                logger.warning(f"Discord enabled but {webhook_var} not set")
-                self.discord_enabled = False
-        
-        if self.telegram_enabled:
-            token_var = self.alert_config['telegram']['bot_token_env_var']
-            chat_var = self.alert_config['telegram']['chat_id_env_var']
-            self.telegram_token = get_env_var(token_var, required=False)
-            self.telegram_chat_id = get_env_var(chat_var, required=False)
-            if not self.telegram_token or not self.telegram_chat_id:
-                logger.warning("Telegram enabled but credentials not set")
-                self.telegram_enabled = False
+        self.channels = build_channels(self.alert_config)
+        self.channel_index = {channel.name: channel for channel in self.channels}
+        self.discord_enabled = 'discord' in self.channel_index
+        self.telegram_enabled = 'telegram' in self.channel_index
+        
+        queue_config = self.alert_config.get('queue', {})
+        self.queue = None
+        self._executor = None
+        if queue_config.get('enabled', True) and self.channels:
+            self.queue = AlertQueue(
+                max_size=queue_config.get('max_size', 100),
+                workers=queue_config.get('workers', 1)
+            )
+        elif len(self.channels) > 1:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.channels), thread_name_prefix="alert-send")
+        self.drain_timeout = queue_config.get('drain_timeout_seconds', 15)
+        
+        outbox_config = self.alert_config.get('outbox', {})
+        self.outbox = None
+        self.replay_max_age = outbox_config.get('replay_max_age_minutes', 30)
+        self.retry_interval = outbox_config.get('retry_interval_seconds', 60)
+        self._last_replay = time.monotonic()
+        self._in_flight: Set[int] = set()
+        self._in_flight_lock = threading.Lock()
+        if outbox_config.get('enabled', True) and self.channels:
+            self.outbox = AlertOutbox(
+                outbox_config.get('file', 'data/alert_outbox.db'),
+                retention_days=outbox_config.get('retention_days', 7)
+            )
+        
+        self.batching_enabled = self.alert_config.get('batching', {}).get('enabled', True)
+        self._batch = threading.local()
+    
+    def close(self):
+        if self.queue:
+            self.queue.close(timeout=self.drain_timeout)
+            self.queue.log_stats()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        if self.outbox:
+            self.outbox.close()
+    
+    def replay_outbox(self) -> int:
+        if not self.outbox:
+            return 0
+        
+        self._last_replay = time.monotonic()
+        with self._in_flight_lock:
+            entries = [
+                entry for entry in self.outbox.pending(self.replay_max_age)
+                if entry['channel'] in self.channel_index and entry['id'] not in self._in_flight
+            ]
+            self._in_flight.update(entry['id'] for entry in entries)
+        if not entries:
+            return 0
+        
+        logger.info(f"Replaying {len(entries)} undelivered alerts from outbox")
+        deliveries = [
+            (entry['channel'], partial(self._deliver, self.channel_index[entry['channel']].send, entry['id']), entry['messages'])
+            for entry in entries
+        ]
+        self._submit(deliveries, "replay")
+        return len(entries)
+    
+    def retry_pending(self) -> int:
+        # Alerts that failed earlier in this run (e.g. still rate limited after max_retries) stay pending;
+        # resend them at most once per retry_interval, skipping deliveries that are still queued.
+        if not self.outbox or time.monotonic() - self._last_replay < self.retry_interval:
+            return 0
+        return self.replay_outbox()
+    
+    def log_queue_stats(self):
+        if self.queue:
+            self.queue.log_stats()
+        for channel in self.channels:
+            stats = channel.stats()
+            logger.info(f"  {channel.name} requests: {stats['sent']} ok, {stats['failed']} failed "
+                        f"({stats['success_rate']:.0%}) | avg {stats['avg_latency_ms']:.0f}ms max {stats['max_latency_ms']:.0f}ms")
     
     def send_entry_signal(self, signal: Dict, account_info: Optional[Dict] = None):
         if not self.alert_config['send_entry_signals']:
@@ -296,51 +362,76 @@ class Alerter:
         
         return message
     
+    def begin_batch(self):
+        if self.batching_enabled:
+            self._batch.messages = []
+    
+    def flush_batch(self):
+        messages = getattr(self._batch, 'messages', None)
+        self._batch.messages = None
+        if messages:
+            alert_type = messages[0][1] if len(messages) == 1 else "batch"
+            self._dispatch([message for message, _ in messages], alert_type)
+        if self.outbox:
+            self.outbox.commit()
+    
     def _send_alert(self, message: str, alert_type: str = "general"):
-        sent = False
-        
-        if self.discord_enabled:
-            if self._send_discord(message):
-                sent = True
+        batch = getattr(self._batch, 'messages', None)
+        if batch is not None and self.channels:
+            batch.append((message, alert_type))
+            return
         
-        if self.telegram_enabled:
-            if self._send_telegram(message):
-                sent = True
+        self._dispatch([message], alert_type)
+    
+    def _dispatch(self, messages: List[str], alert_type: str):
+        deliveries = []
+        for channel in self.channels:
+            for chunk in channel.chunk(messages):
+                deliveries.append((channel.name, channel.send, chunk))
         
-        if not sent:
+        if not deliveries:
             logger.warning(f"Alert not sent (no channels configured): {alert_type}")
+            self._print_console(messages)
+            return
+        
+        if self.outbox:
+            with self._in_flight_lock:
+                alert_ids = [self.outbox.record(name, alert_type, chunk) for name, _, chunk in deliveries]
+                self._in_flight.update(alert_ids)
+            deliveries = [
+                (name, partial(self._deliver, send_fn, alert_id), chunk)
+                for (name, send_fn, chunk), alert_id in zip(deliveries, alert_ids)
+            ]
+        
+        if not self._submit(deliveries, alert_type):
+            logger.warning(f"Alert not delivered on any channel: {alert_type}")
+            self._print_console(messages)
+    
+    @staticmethod
+    def _print_console(messages: List[str]):
+        for message in messages:
             print(f"\n{'='*60}")
             print(message)
             print('='*60)
     
-    def _send_discord(self, message: str) -> bool:
-        try:
-            payload = {"content": message}
-            response = requests.post(
-                self.discord_webhook, 
-                json=payload, 
-                timeout=10
-            )
-            response.raise_for_status()
-            logger.debug("Discord alert sent successfully")
+    def _submit(self, deliveries: List[tuple], alert_type: str) -> bool:
+        if self.queue:
+            for name, send_fn, chunk in deliveries:
+                self.queue.submit(name, send_fn, chunk, alert_type)
             return True
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to send Discord alert: {e}")
-            return False
+        
+        if self._executor and len(deliveries) > 1:
+            futures = [self._executor.submit(send_fn, chunk) for _, send_fn, chunk in deliveries]
+            sent = any([future.result() for future in futures])
+        else:
+            sent = any([send_fn(chunk) for _, send_fn, chunk in deliveries])
+        return sent
     
-    def _send_telegram(self, message: str) -> bool:
+    def _deliver(self, send_fn, alert_id: int, messages: List[str]) -> bool:
         try:
-            url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-            payload = {
-                "chat_id": self.telegram_chat_id,
-                "text": message,
-                "parse_mode": "Markdown"
-            }
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            logger.debug("Telegram alert sent successfully")
-            return True
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to send Telegram alert: {e}")
-            return False
-
+            sent = send_fn(messages)
+            self.outbox.mark(alert_id, sent)
+            return sent
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(alert_id)
@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SIDE_NAMES = ('LONG', 'SHORT')
+
+class CooldownTable:
+    # Last alert time per (coin id, side) as monotonic seconds; column 0 is LONG, 1 is SHORT.
+    # Persisted as wall-clock times keyed by symbol, since monotonic clocks restart with the process.
+    def __init__(self, store, cooldown_seconds: float, path: Optional[str] = None, initial_rows: int = 512):
+        self.store = store
+        self.cooldown = cooldown_seconds
+        self.path = path
+        self.last = np.full((initial_rows, 2), -np.inf)
+        self.dirty = False
+        if path:
+            self.load()
+
+    def _ensure(self, max_row: int):
+        if max_row < len(self.last):
+            return
+        grown = np.full((max(max_row + 1, len(self.last) * 2), 2), -np.inf)
+        grown[:len(self.last)] = self.last
+        self.last = grown
+
+    def eligible(self, rows: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        if not len(rows):
+            return np.ones((0, 2), dtype=bool)
+        self._ensure(int(rows.max()))
+        now = time.monotonic() if now is None else now
+        return now - self.last[rows] >= self.cooldown
+
+    def stamp(self, rows: np.ndarray, directions: np.ndarray, now: Optional[float] = None):
+        if not len(rows):
+            return
+        self._ensure(int(rows.max()))
+        self.last[rows, (directions < 0).astype(np.int64)] = time.monotonic() if now is None else now
+        self.dirty = True
+
+    def save(self) -> bool:
+        if not self.path or not self.dirty:
+            return False
+
+        now = time.monotonic()
+        wall_now = time.time()
+        size = min(self.store.size, len(self.last))
+        active_rows, active_sides = np.nonzero(now - self.last[:size] < self.cooldown)
+        cooldowns = {}
+        for row, side in zip(active_rows, active_sides):
+            symbol = self.store.symbols[row]
+            cooldowns.setdefault(symbol, {})[SIDE_NAMES[side]] = round(wall_now - (now - self.last[row, side]), 3)
+
+        try:
+            target = Path(self.path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = target.with_name(target.name + '.tmp')
+            with open(temp_path, 'w') as f:
+                json.dump({'saved_at': wall_now, 'cooldowns': cooldowns}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, target)
+        except OSError as e:
+            logger.warning(f"Failed to save signal cooldowns: {e}")
+            return False
+
+        self.dirty = False
+        return True
+
+    def load(self) -> int:
+        if not Path(self.path).exists():
+            return 0
+        try:
+            with open(self.path) as f:
+                cooldowns = json.load(f).get('cooldowns', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load signal cooldowns {self.path}: {e}")
+            return 0
+
+        now = time.monotonic()
+        wall_now = time.time()
+        restored = 0
+        for symbol, sides in cooldowns.items():
+            for side, sent_at in sides.items():
+                if side not in SIDE_NAMES or wall_now - sent_at >= self.cooldown:
+                    continue
+                row = self.store.row_for(symbol)
+                self._ensure(row)
+                self.last[row, SIDE_NAMES.index(side)] = now - (wall_now - sent_at)
+                restored += 1
+
+        if restored:
+            logger.info(f"Restored {restored} active signal cooldowns")
+        return restored
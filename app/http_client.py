@@ -0,0 +1,29 @@
+import requests
+import logging
+from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'User-Agent': 'crypto-alerts/1.0'
+}
+
+def create_session(pool_size: int = 4, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+def get_timeouts(config) -> tuple[float, float]:
+    performance = config.get('performance', {})
+    read_timeout = performance.get('api_timeout_seconds', 10)
+    connect_timeout = performance.get('connect_timeout_seconds', min(3, read_timeout))
+    return connect_timeout, read_timeout
@@ -0,0 +1,85 @@
+import numpy as np
+from functools import lru_cache
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+EMA_MATRIX_MAX_PERIODS = 256
+
+TREND_BULLISH = 1
+TREND_NEUTRAL = 0
+TREND_BEARISH = -1
+
+TREND_NAMES = {TREND_BULLISH: 'bullish', TREND_NEUTRAL: 'neutral', TREND_BEARISH: 'bearish'}
+
+ANALYSIS_DTYPE = np.dtype([
+    ('rsi', np.float64),
+    ('macd', np.float64),
+    ('macd_signal', np.float64),
+    ('macd_histogram', np.float64),
+    ('bullish_crossover', np.bool_),
+    ('bearish_crossover', np.bool_),
+    ('bb_upper', np.float64),
+    ('bb_middle', np.float64),
+    ('bb_lower', np.float64),
+    ('bb_current', np.float64),
+    ('bb_position', np.float64),
+    ('bb_at_lower', np.bool_),
+    ('bb_at_upper', np.bool_),
+    ('bb_bandwidth', np.float64),
+    ('volume_surge', np.bool_),
+    ('volume_multiplier', np.float64),
+    ('volume_average', np.float64),
+    ('momentum_trend', np.int8),
+    ('momentum_strength', np.float64),
+    ('momentum_change', np.float64),
+    ('has_data', np.bool_)
+])
+
+@lru_cache(maxsize=64)
+def _ema_weights(length: int, period: int) -> np.ndarray:
+    multiplier = 2 / (period + 1)
+    lags = np.arange(length)[None, :] - np.arange(length)[:, None]
+    weights = np.where(lags >= 0, multiplier * (1 - multiplier) ** np.maximum(lags, 0), 0.0)
+    weights[0] = (1 - multiplier) ** np.arange(length)
+    weights.setflags(write=False)
+    return weights
+
+@lru_cache(maxsize=16)
+def macd_weights(length: int, fast: int, slow: int, signal: int) -> np.ndarray:
+    # MACD over a window is linear in its prices: columns give the MACD line, signal line,
+    # histogram and previous histogram at the end of a window seeded at its first sample. Each
+    # column sums to 0, so callers subtract the window's first price to keep flat windows exact.
+    macd_matrix = _ema_weights(length, fast) - _ema_weights(length, slow)
+    signal_matrix = macd_matrix @ _ema_weights(length, signal)
+    histogram = macd_matrix - signal_matrix
+    weights = np.stack([macd_matrix[:, -1], signal_matrix[:, -1], histogram[:, -1], histogram[:, -2]], axis=1)
+    weights.setflags(write=False)
+    return weights
+
+def ema_filter(values: np.ndarray, period: int) -> np.ndarray:
+    # Filters the offset from each row's first value; EMA weights sum to 1, so the offset is added
+    # back exactly and a flat series yields an exactly flat EMA instead of rounding noise.
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1] == 0:
+        return values.copy()
+    
+    offset = values[..., :1]
+    values = values - offset
+    length = values.shape[-1]
+    if length <= EMA_MATRIX_MAX_PERIODS:
+        return values @ _ema_weights(length, period) + offset
+    
+    multiplier = 2 / (period + 1)
+    if lfilter is not None:
+        initial = ((1 - multiplier) * values[..., :1])
+        ema, _ = lfilter([multiplier], [1, multiplier - 1], values, axis=-1, zi=initial)
+        return ema + offset
+    
+    ema = np.empty_like(values)
+    ema[..., 0] = values[..., 0]
+    for i in range(1, length):
+        ema[..., i] = (values[..., i] * multiplier) + (ema[..., i-1] * (1 - multiplier))
+    return ema + offset
@@ -0,0 +1,354 @@
+import logging
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Set
+from numpy.lib.stride_tricks import sliding_window_view
+from app.indicator_core import ANALYSIS_DTYPE, TREND_BULLISH, TREND_BEARISH, TREND_NEUTRAL, ema_filter
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ('prices', 'volumes', 'current_volumes')
+
+NAN_FIELDS = ('rsi', 'macd', 'macd_signal', 'macd_histogram', 'bb_upper', 'bb_middle',
+              'bb_lower', 'bb_current', 'bb_position', 'bb_bandwidth', 'momentum_change')
+
+class IndicatorRegistry:
+    # Intermediates are arrays shared between indicators (diffs, EMAs, window statistics), keyed
+    # by name and parameters. Indicators declare the intermediates and config parameters they use
+    # and the result fields they fill; each scan computes every intermediate at most once.
+    def __init__(self):
+        self.intermediates: Dict[str, Dict] = {}
+        self.indicators: Dict[str, Dict] = {}
+
+    def intermediate(self, name: str, inputs: Sequence[str] = ('prices',)):
+        def decorator(function: Callable):
+            self.intermediates[name] = {'function': function, 'inputs': tuple(inputs)}
+            return function
+        return decorator
+
+    def indicator(self, name: str, fields: Sequence[str], inputs: Sequence[str] = (),
+                  params: Optional[Dict[str, object]] = None, deferred: bool = False, builtin: bool = False):
+        def decorator(function: Callable):
+            self.indicators[name] = {
+                'function': function,
+                'fields': tuple(fields),
+                'inputs': tuple(inputs),
+                'params': dict(params or {}),
+                'deferred': deferred,
+                'builtin': builtin
+            }
+            return function
+        return decorator
+
+    def resolve(self, names: Sequence[str]) -> List[str]:
+        # Topological order of the intermediates the given indicators depend on.
+        order: List[str] = []
+        visiting: Set[str] = set()
+
+        def visit(name: str, requested_by: str):
+            if name in SOURCES or name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Indicator intermediates form a cycle at '{name}'")
+            if name not in self.intermediates:
+                raise ValueError(f"'{requested_by}' depends on unknown intermediate '{name}'")
+            visiting.add(name)
+            for dependency in self.intermediates[name]['inputs']:
+                visit(dependency, name)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in names:
+            if name not in self.indicators:
+                raise ValueError(f"Unknown indicator '{name}'")
+            for dependency in self.indicators[name]['inputs']:
+                visit(dependency, name)
+        return order
+
+REGISTRY = IndicatorRegistry()
+register_intermediate = REGISTRY.intermediate
+register_indicator = REGISTRY.indicator
+
+class IndicatorContext:
+    def __init__(self, registry: IndicatorRegistry, prices: np.ndarray, volumes: np.ndarray,
+                 current_volumes: np.ndarray):
+        self.registry = registry
+        self.prices = prices
+        self.volumes = volumes
+        self.current_volumes = current_volumes
+        self.cache: Dict[tuple, np.ndarray] = {}
+        self.computed = 0
+        self.reused = 0
+
+    def get(self, name: str, *params) -> np.ndarray:
+        if name in SOURCES:
+            return getattr(self, name)
+        key = (name,) + params
+        value = self.cache.get(key)
+        if value is not None:
+            self.reused += 1
+            return value
+        value = self.registry.intermediates[name]['function'](self, *params)
+        self.cache[key] = value
+        self.computed += 1
+        return value
+
+class IndicatorEngine:
+    def __init__(self, config, registry: IndicatorRegistry = REGISTRY):
+        self.registry = registry
+        self.config = config['signals']['indicators']
+        plugins = list(self.config.get('plugins') or [])
+
+        unknown = [name for name in plugins if name not in registry.indicators]
+        if unknown:
+            raise ValueError(f"Unknown indicator plugins: {', '.join(unknown)}")
+        builtins = [name for name, spec in registry.indicators.items() if spec['builtin']]
+        self.enabled = builtins + [name for name in plugins if name not in builtins]
+        self.plugins = [name for name in self.enabled if name not in builtins]
+        self.plan = registry.resolve(self.enabled)
+
+        self.params = {
+            name: {key: self.config.get(key, default) for key, default in registry.indicators[name]['params'].items()}
+            for name in self.enabled
+        }
+        extra_fields = [(field, np.float64) for name in self.plugins for field in registry.indicators[name]['fields']]
+        base_fields = [(field, ANALYSIS_DTYPE.fields[field][0]) for field in ANALYSIS_DTYPE.names if field != 'has_data']
+        self.dtype = np.dtype(base_fields + extra_fields + [('has_data', np.bool_)])
+        self.nan_fields = NAN_FIELDS + tuple(field for field, _ in extra_fields)
+        self.last_stats: Dict[str, int] = {}
+        self.last_lazy_stats: Dict[str, int] = {}
+        self.last_skipped: Optional[np.ndarray] = None
+
+        logger.info(f"Indicator plan: {', '.join(self.enabled)} sharing {len(self.plan)} intermediates ({', '.join(self.plan)})")
+
+    @property
+    def fields(self) -> Set[str]:
+        return set(self.dtype.names)
+
+    def empty_results(self, count: int) -> np.ndarray:
+        results = np.zeros(count, dtype=self.dtype)
+        for field in self.nan_fields:
+            results[field] = np.nan
+        return results
+
+    def compute(self, names: Sequence[str], context: IndicatorContext, results: np.ndarray):
+        for name in names:
+            self.registry.indicators[name]['function'](context, results, **self.params[name])
+
+    def evaluate(self, prices: np.ndarray, volumes: np.ndarray, current_volumes: np.ndarray,
+                 needs_deferred: Optional[Callable[[np.ndarray, Set[str]], np.ndarray]] = None) -> np.ndarray:
+        results = self.empty_results(len(prices))
+        context = IndicatorContext(self.registry, prices, volumes, current_volumes)
+        immediate = [name for name in self.enabled if not self.registry.indicators[name]['deferred']]
+        deferred = [name for name in self.enabled if self.registry.indicators[name]['deferred']]
+        self.compute(immediate, context, results)
+
+        contexts = [context]
+        self.last_skipped = None
+        if needs_deferred is None:
+            self.compute(deferred, context, results)
+        else:
+            computed = {field for name in immediate for field in self.registry.indicators[name]['fields']}
+            rows = np.flatnonzero(needs_deferred(results, computed))
+            subset = IndicatorContext(self.registry, prices[rows], volumes[rows], current_volumes[rows])
+            partial = results[rows]
+            self.compute(deferred, subset, partial)
+            results[rows] = partial
+            contexts.append(subset)
+            self.last_skipped = np.ones(len(prices), dtype=bool)
+            self.last_skipped[rows] = False
+            skipped = len(prices) - len(rows)
+            self.last_lazy_stats = {
+                'rows': len(prices),
+                'skipped': skipped,
+                'evaluations_avoided': skipped * len(deferred)
+            }
+
+        self.last_stats = {
+            'intermediates_computed': sum(ctx.computed for ctx in contexts),
+            'intermediates_reused': sum(ctx.reused for ctx in contexts)
+        }
+        results['has_data'] = ~(np.isnan(results['rsi']) | np.isnan(results['macd']) | np.isnan(results['bb_middle']))
+        return results
+
+def available_fields(config) -> Set[str]:
+    plugins = config['signals']['indicators'].get('plugins') or []
+    fields = set(ANALYSIS_DTYPE.names)
+    for name in plugins:
+        if name in REGISTRY.indicators:
+            fields.update(REGISTRY.indicators[name]['fields'])
+    return fields
+
+@register_intermediate('diff')
+def _diff(ctx: IndicatorContext) -> np.ndarray:
+    return np.diff(ctx.prices, axis=1)
+
+@register_intermediate('gains', inputs=('diff',))
+def _gains(ctx: IndicatorContext) -> np.ndarray:
+    deltas = ctx.get('diff')
+    return np.where(deltas > 0, deltas, 0)
+
+@register_intermediate('losses', inputs=('diff',))
+def _losses(ctx: IndicatorContext) -> np.ndarray:
+    deltas = ctx.get('diff')
+    return np.where(deltas < 0, -deltas, 0)
+
+@register_intermediate('true_range', inputs=('diff',))
+def _true_range(ctx: IndicatorContext) -> np.ndarray:
+    return np.abs(ctx.get('diff'))
+
+@register_intermediate('ema')
+def _ema(ctx: IndicatorContext, period: int) -> np.ndarray:
+    return ema_filter(ctx.prices, period)
+
+@register_intermediate('window_mean')
+def _window_mean(ctx: IndicatorContext, period: int) -> np.ndarray:
+    return ctx.prices[:, -period:].mean(axis=1)
+
+@register_intermediate('window_std')
+def _window_std(ctx: IndicatorContext, period: int) -> np.ndarray:
+    return ctx.prices[:, -period:].std(axis=1)
+
+@register_intermediate('rolling_windows')
+def _rolling_windows(ctx: IndicatorContext, period: int, count: int) -> np.ndarray:
+    return sliding_window_view(ctx.prices[:, -(period + count - 1):], period, axis=1)
+
+@register_intermediate('rolling_max', inputs=('rolling_windows',))
+def _rolling_max(ctx: IndicatorContext, period: int, count: int) -> np.ndarray:
+    return ctx.get('rolling_windows', period, count).max(axis=2)
+
+@register_intermediate('rolling_min', inputs=('rolling_windows',))
+def _rolling_min(ctx: IndicatorContext, period: int, count: int) -> np.ndarray:
+    return ctx.get('rolling_windows', period, count).min(axis=2)
+
+@register_intermediate('price_volume', inputs=('prices', 'volumes'))
+def _price_volume(ctx: IndicatorContext, period: int) -> np.ndarray:
+    # Price and volume histories can differ in length, so both are aligned on the latest period.
+    return ctx.prices[:, -period:] * ctx.volumes[:, -period:]
+
+@register_indicator('rsi', fields=('rsi',), inputs=('gains', 'losses'), params={'rsi_period': 14}, builtin=True)
+def _rsi(ctx: IndicatorContext, results: np.ndarray, rsi_period: int):
+    if ctx.prices.shape[1] < rsi_period + 1:
+        return
+    avg_gain = ctx.get('gains')[:, -rsi_period:].mean(axis=1)
+    avg_loss = ctx.get('losses')[:, -rsi_period:].mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    results['rsi'] = np.where(avg_loss == 0, 100.0, rsi)
+
+@register_indicator('macd', fields=('macd', 'macd_signal', 'macd_histogram', 'bullish_crossover', 'bearish_crossover'),
+                    inputs=('ema',), params={'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9}, deferred=True, builtin=True)
+def _macd(ctx: IndicatorContext, results: np.ndarray, macd_fast: int, macd_slow: int, macd_signal: int):
+    if ctx.prices.shape[1] < macd_slow + macd_signal:
+        return
+    macd_line = ctx.get('ema', macd_fast) - ctx.get('ema', macd_slow)
+    signal_line = ema_filter(macd_line, macd_signal)
+    histogram = macd_line[:, -1] - signal_line[:, -1]
+    previous = macd_line[:, -2] - signal_line[:, -2]
+
+    results['macd'] = macd_line[:, -1]
+    results['macd_signal'] = signal_line[:, -1]
+    results['macd_histogram'] = histogram
+    results['bullish_crossover'] = (histogram > 0) & (previous < 0)
+    results['bearish_crossover'] = (histogram < 0) & (previous > 0)
+
+@register_indicator('bollinger', fields=('bb_upper', 'bb_middle', 'bb_lower', 'bb_current', 'bb_position',
+                                         'bb_at_lower', 'bb_at_upper', 'bb_bandwidth'),
+                    inputs=('window_mean', 'window_std'), params={'bb_period': 20, 'bb_std': 2}, deferred=True, builtin=True)
+def _bollinger(ctx: IndicatorContext, results: np.ndarray, bb_period: int, bb_std: float):
+    if ctx.prices.shape[1] < bb_period:
+        return
+    sma = ctx.get('window_mean', bb_period)
+    std = ctx.get('window_std', bb_period)
+    upper_band = sma + (bb_std * std)
+    lower_band = sma - (bb_std * std)
+    current_price = ctx.prices[:, -1]
+
+    width = upper_band - lower_band
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bb_position = np.where(width != 0, (current_price - lower_band) / width, 0.5)
+        bandwidth = width / sma * 100
+
+    results['bb_upper'] = upper_band
+    results['bb_middle'] = sma
+    results['bb_lower'] = lower_band
+    results['bb_current'] = current_price
+    results['bb_position'] = bb_position
+    results['bb_at_lower'] = bb_position < 0.2
+    results['bb_at_upper'] = bb_position > 0.8
+    results['bb_bandwidth'] = bandwidth
+
+@register_indicator('volume', fields=('volume_surge', 'volume_multiplier', 'volume_average'),
+                    inputs=('volumes', 'current_volumes'), params={'volume_surge_multiplier': 2.0}, builtin=True)
+def _volume(ctx: IndicatorContext, results: np.ndarray, volume_surge_multiplier: float):
+    current_volumes = ctx.current_volumes
+    if ctx.volumes.shape[1] < 5:
+        results['volume_surge'] = False
+        results['volume_multiplier'] = 1.0
+        results['volume_average'] = current_volumes
+        return
+
+    avg_volume = ctx.volumes[:, :-1].mean(axis=1)
+    has_average = avg_volume != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_multiplier = np.where(has_average, current_volumes / avg_volume, 1.0)
+
+    results['volume_surge'] = has_average & (volume_multiplier >= volume_surge_multiplier)
+    results['volume_multiplier'] = volume_multiplier
+    results['volume_average'] = avg_volume
+
+@register_indicator('momentum', fields=('momentum_trend', 'momentum_strength', 'momentum_change'),
+                    inputs=('diff',), builtin=True)
+def _momentum(ctx: IndicatorContext, results: np.ndarray):
+    if ctx.prices.shape[1] < 5:
+        results['momentum_trend'] = TREND_NEUTRAL
+        results['momentum_strength'] = 0
+        return
+
+    price_changes = ctx.get('diff')[:, -4:]
+    positive_changes = np.count_nonzero(price_changes > 0, axis=1)
+    negative_changes = np.count_nonzero(price_changes < 0, axis=1)
+
+    start = ctx.prices[:, -5]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total_change = (ctx.prices[:, -1] - start) / start * 100
+
+    results['momentum_trend'] = np.where(
+        positive_changes >= 3, TREND_BULLISH,
+        np.where(negative_changes >= 3, TREND_BEARISH, TREND_NEUTRAL)
+    )
+    results['momentum_strength'] = np.abs(total_change)
+    results['momentum_change'] = total_change
+
+@register_indicator('atr', fields=('atr', 'atr_percent'), inputs=('true_range',), params={'atr_period': 14})
+def _atr(ctx: IndicatorContext, results: np.ndarray, atr_period: int):
+    # Ticks carry no intra-period high/low, so the true range is the close-to-close move.
+    if ctx.prices.shape[1] < atr_period + 1:
+        return
+    atr = ctx.get('true_range')[:, -atr_period:].mean(axis=1)
+    results['atr'] = atr
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['atr_percent'] = atr / ctx.prices[:, -1] * 100
+
+@register_indicator('vwap', fields=('vwap', 'vwap_distance'), inputs=('price_volume',), params={'vwap_period': 20})
+def _vwap(ctx: IndicatorContext, results: np.ndarray, vwap_period: int):
+    # Tickers only carry rolling 24h volume (its diffs also lose trades leaving the window), so each
+    # price is weighted by the 24h volume at that tick rather than by the volume traded in the interval.
+    if ctx.prices.shape[1] < vwap_period or ctx.volumes.shape[1] < vwap_period:
+        return
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = ctx.get('price_volume', vwap_period).sum(axis=1) / ctx.volumes[:, -vwap_period:].sum(axis=1)
+        results['vwap'] = vwap
+        results['vwap_distance'] = (ctx.prices[:, -1] - vwap) / vwap * 100
+
+@register_indicator('stochastic', fields=('stoch_k', 'stoch_d'), inputs=('rolling_max', 'rolling_min'),
+                    params={'stoch_period': 14, 'stoch_smooth': 3})
+def _stochastic(ctx: IndicatorContext, results: np.ndarray, stoch_period: int, stoch_smooth: int):
+    if ctx.prices.shape[1] < stoch_period + stoch_smooth - 1:
+        return
+    highest = ctx.get('rolling_max', stoch_period, stoch_smooth)
+    lowest = ctx.get('rolling_min', stoch_period, stoch_smooth)
+    closes = ctx.prices[:, -stoch_smooth:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k_values = np.where(highest > lowest, (closes - lowest) / (highest - lowest) * 100, 50.0)
+    results['stoch_k'] = k_values[:, -1]
+    results['stoch_d'] = k_values.mean(axis=1)
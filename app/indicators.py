@@ -1,12 +1,17 @@
 import numpy as np
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Set
 import logging
+from app.indicator_core import ANALYSIS_DTYPE, TREND_NAMES, ema_filter
+from app.indicator_registry import IndicatorEngine
 
 logger = logging.getLogger(__name__)
 
 class TechnicalIndicators:
     def __init__(self, config):
         self.config = config['signals']['indicators']
+        self.engine = IndicatorEngine(config)
+        self.last_lazy_stats: Dict[str, int] = {}
+        self.last_skipped: Optional[np.ndarray] = None
         
     def calculate_rsi(self, prices: List[float], period: Optional[int] = None) -> Optional[float]:
         if period is None:
@@ -15,7 +20,7 @@ class TechnicalIndicators:
         if len(prices) < period + 1:
             return None
         
-        prices_array = np.array(prices)
+        prices_array = np.asarray(prices, dtype=np.float64)
         deltas = np.diff(prices_array)
         
         gains = np.where(deltas > 0, deltas, 0)
@@ -40,7 +45,7 @@ class TechnicalIndicators:
         if len(prices) < slow + signal:
             return None
         
-        prices_array = np.array(prices)
+        prices_array = np.asarray(prices, dtype=np.float64)
         
         ema_fast = self._calculate_ema(prices_array, fast)
         ema_slow = self._calculate_ema(prices_array, slow)
@@ -64,7 +69,7 @@ class TechnicalIndicators:
         if len(prices) < period:
             return None
         
-        prices_array = np.array(prices[-period:])
+        prices_array = np.asarray(prices[-period:], dtype=np.float64)
         sma = np.mean(prices_array)
         std = np.std(prices_array)
         
@@ -142,28 +147,81 @@ class TechnicalIndicators:
         }
     
     def _calculate_ema(self, prices: np.ndarray, period: int) -> np.ndarray:
-        multiplier = 2 / (period + 1)
-        ema = np.zeros(len(prices))
-        ema[0] = prices[0]
+        return ema_filter(prices, period)
+    
+    def analyze_universe(self, price_matrix: np.ndarray, volume_matrix: np.ndarray,
+                         current_volumes: Optional[np.ndarray] = None,
+                         needs_deferred: Optional[Callable[[np.ndarray, Set[str]], np.ndarray]] = None) -> np.ndarray:
+        # With needs_deferred, the cheap indicators run first and MACD/Bollinger only run for rows
+        # the callback still considers able to signal; skipped rows are left without data.
+        prices = np.asarray(price_matrix, dtype=np.float64)
+        volumes = np.asarray(volume_matrix, dtype=np.float64)
+        if current_volumes is None:
+            current_volumes = volumes[:, -1] if volumes.shape[1] else np.zeros(len(volumes))
+        
+        results = self.engine.evaluate(prices, volumes, np.asarray(current_volumes, dtype=np.float64), needs_deferred)
+        self.last_skipped = self.engine.last_skipped
+        if needs_deferred is not None:
+            self.last_lazy_stats = self.engine.last_lazy_stats
+        return results
+    
+    def to_analysis(self, result: np.void) -> Dict[str, any]:
+        rsi = None if np.isnan(result['rsi']) else float(result['rsi'])
+        
+        macd = None
+        if not np.isnan(result['macd']):
+            macd = {
+                'macd': float(result['macd']),
+                'signal': float(result['macd_signal']),
+                'histogram': float(result['macd_histogram']),
+                'bullish_crossover': bool(result['bullish_crossover']),
+                'bearish_crossover': bool(result['bearish_crossover'])
+            }
         
-        for i in range(1, len(prices)):
-            ema[i] = (prices[i] * multiplier) + (ema[i-1] * (1 - multiplier))
+        bb = None
+        if not np.isnan(result['bb_middle']):
+            bb = {
+                'upper': float(result['bb_upper']),
+                'middle': float(result['bb_middle']),
+                'lower': float(result['bb_lower']),
+                'current': float(result['bb_current']),
+                'position': float(result['bb_position']),
+                'at_lower': bool(result['bb_at_lower']),
+                'at_upper': bool(result['bb_at_upper']),
+                'bandwidth': float(result['bb_bandwidth'])
+            }
         
-        return ema
-    
-    def analyze_coin(self, prices: List[float], current_volume: float, volume_history: List[float]) -> Dict[str, any]:
-        rsi = self.calculate_rsi(prices)
-        macd = self.calculate_macd(prices)
-        bb = self.calculate_bollinger_bands(prices)
-        volume = self.detect_volume_surge(current_volume, volume_history)
-        momentum = self.detect_price_momentum(prices)
+        volume = {
+            'is_surge': bool(result['volume_surge']),
+            'multiplier': float(result['volume_multiplier']),
+            'average': float(result['volume_average'])
+        }
         
-        return {
+        momentum = {
+            'trend': TREND_NAMES[int(result['momentum_trend'])],
+            'strength': float(result['momentum_strength'])
+        }
+        if not np.isnan(result['momentum_change']):
+            momentum['change_percent'] = float(result['momentum_change'])
+        
+        analysis = {
             'rsi': rsi,
             'macd': macd,
             'bollinger_bands': bb,
             'volume': volume,
             'momentum': momentum,
-            'has_data': all([rsi is not None, macd is not None, bb is not None])
+            'has_data': bool(result['has_data'])
         }
-
+        for field in result.dtype.names:
+            if field not in ANALYSIS_DTYPE.names:
+                value = result[field].item()
+                analysis[field] = None if isinstance(value, float) and np.isnan(value) else value
+        return analysis
+    
+    def analyze_coin(self, prices: List[float], current_volume: float, volume_history: List[float]) -> Dict[str, any]:
+        results = self.analyze_universe(
+            np.asarray(prices, dtype=np.float64).reshape(1, -1),
+            np.asarray(volume_history, dtype=np.float64).reshape(1, -1),
+            np.array([current_volume], dtype=np.float64)
+        )
+        return self.to_analysis(results[0])
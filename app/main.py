@@ -1,14 +1,21 @@
 import sys
 import time
+import signal as process_signal
 import logging
 from datetime import datetime
 from pathlib import Path
 from apscheduler.schedulers.blocking import BlockingScheduler
 import pytz
+import numpy as np
 
-from app.utils import load_config, setup_logging, load_futures_coins, is_trading_hours, get_current_trading_period, get_env_var
+from app.utils import load_config, setup_logging, is_trading_hours, get_current_trading_period, get_env_var
+from app.universe import CoinUniverse
+from app.scan_scheduler import ScanScheduler
+from app.position_tracker import PositionTracker
+from app.prescreen import PreScreen
 from app.scanner import PriceScanner
 from app.indicators import TechnicalIndicators
+from app.streaming_indicators import StreamingIndicators
 from app.signal_generator import SignalGenerator
 from app.risk_manager import RiskManager
 from app.account_manager import AccountManager
@@ -22,6 +29,11 @@ signal_generator = None
 risk_manager = None
 account_manager = None
 alerter = None
+universe = None
+scan_scheduler = None
+scan_offset = 0
+position_tracker = None
+prescreen = None
 
 trading_active = False
 current_period_name = None
@@ -36,7 +48,7 @@ daily_stats = {
 }
 
 def initialize_system():
-    global logger, config, scanner, indicators, signal_generator, risk_manager, account_manager, alerter
+    global logger, config, scanner, indicators, signal_generator, risk_manager, account_manager, alerter, universe, position_tracker, prescreen
     
     try:
         config = load_config()
@@ -56,11 +68,28 @@ def initialize_system():
         else:
             logger.info(f"Trading Hours: {trading_hours.get('start_time', 'N/A')} - {trading_hours.get('end_time', 'N/A')} IST")
         
+        universe = CoinUniverse(config['scanner']['coins_file'])
         scanner = PriceScanner(config)
-        indicators = TechnicalIndicators(config)
+        if config['signals']['indicators'].get('streaming', False):
+            indicators = StreamingIndicators(config, scanner.store, volume_window=scanner.volume_window)
+            scanner.add_tick_listener(indicators.update)
+            logger.info("Streaming indicator mode enabled (O(1) updates per tick)")
+        else:
+            indicators = TechnicalIndicators(config)
         risk_manager = RiskManager(config)
-        signal_generator = SignalGenerator(config, indicators, risk_manager)
+        signal_generator = SignalGenerator(config, indicators, risk_manager, scanner.store)
+        if config['signals'].get('prescreen', {}).get('enabled', True):
+            custom_strategies = signal_generator.rules.custom_strategies()
+            if custom_strategies:
+                logger.warning(f"Pre-screen disabled: its thresholds assume the default rules, but strategies "
+                               f"{', '.join(custom_strategies)} use custom rules or min_votes")
+            else:
+                prescreen = PreScreen(config)
         alerter = Alerter(config, risk_manager)
+        alerter.replay_outbox()
+        
+        if config['risk'].get('position_tracking', {}).get('enabled', True):
+            position_tracker = PositionTracker(config, scanner.store, risk_manager, alerter)
         
         if config['mode'] == 'personalized' and config['personalized']['enabled']:
             api_key = get_env_var('COINDCX_API_KEY', required=False)
@@ -68,6 +97,7 @@ def initialize_system():
             
             if api_key and api_secret:
                 account_manager = AccountManager(config, api_key, api_secret)
+                account_manager.start_background_refresh()
                 logger.info("Personalized mode enabled with API integration")
             else:
                 logger.warning("Personalized mode requested but API keys not found, using generic mode")
@@ -76,10 +106,12 @@ def initialize_system():
         logger.info("="*60)
         
         try:
-            coins = load_futures_coins(config['scanner']['coins_file'])
-            alerter.send_startup_alert(len(coins))
+            alerter.begin_batch()
+            alerter.send_startup_alert(len(universe))
         except Exception as e:
             logger.warning(f"Could not send startup alert: {e}")
+        finally:
+            alerter.flush_batch()
         
         return True
         
@@ -107,8 +139,9 @@ def start_trading_session():
     }
     
     try:
-        coins = load_futures_coins(config['scanner']['coins_file'])
-        logger.info(f"Loaded {len(coins)} futures coins to monitor")
+        alerter.begin_batch()
+        universe.refresh()
+        logger.info(f"Loaded {len(universe)} futures coins to monitor")
         
         account_info = None
         if account_manager:
@@ -117,11 +150,13 @@ def start_trading_session():
             logger.info(f"Account Balance: ₹{account_info['total_balance']:.2f}")
             logger.info(f"Available Margin: ₹{account_info['available_margin']:.2f}")
         
-        alerter.send_session_start_alert(len(coins), account_info)
+        alerter.send_session_start_alert(len(universe), account_info)
         
     except Exception as e:
         logger.error(f"Error starting trading session: {e}")
         alerter.send_error_alert(f"Failed to start trading session: {e}")
+    finally:
+        alerter.flush_batch()
 
 def stop_trading_session():
     global trading_active
@@ -130,32 +165,43 @@ def stop_trading_session():
     trading_active = False
     
     try:
+        alerter.begin_batch()
         alerter.send_session_end_alert(daily_stats)
         logger.info(f"Daily Summary - Signals: {daily_stats['total_signals']}, Trades: {daily_stats['trades_executed']}")
+        if scan_scheduler:
+            scan_scheduler.log_stats()
+        if prescreen is not None and prescreen.totals['screened']:
+            totals = prescreen.totals
+            logger.info(f"Pre-screen: {totals['passed']}/{totals['screened']} coins passed to analysis "
+                        f"({1 - totals['passed'] / totals['screened']:.0%} pruned)")
+        alerter.log_queue_stats()
         
     except Exception as e:
         logger.error(f"Error stopping trading session: {e}")
+    finally:
+        alerter.flush_batch()
     
     logger.info("Trading session stopped. System idle until next trading day.")
 
-def scan_and_signal():
-    global current_period_name
+def scan_and_signal(universe_fraction: float = 1.0):
+    global current_period_name, scan_offset
     
     if not trading_active:
-        return
+        return False
     
-    if config['mode'] == 'generic':
+    if config['mode'] == 'generic' and position_tracker is None:
         expiry_minutes = config['risk'].get('position_expiry_minutes', 5)
         risk_manager.cleanup_expired_positions(max_age_minutes=expiry_minutes)
     
     is_trading, current_period = get_current_trading_period(config)
     if not is_trading:
-        return
+        return False
     
     if current_period:
         period_name = current_period.get('name', 'default')
         min_confidence = current_period.get('min_confidence')
         max_alerts = current_period.get('max_alerts_per_scan')
+        strategy = current_period.get('strategy')
         
         if current_period_name is not None and current_period_name != period_name:
             logger.info(f"Period changed: {current_period_name} → {period_name}")
@@ -173,58 +219,97 @@ def scan_and_signal():
         period_name = 'default'
         min_confidence = config.get('signals', {}).get('min_confidence', 60)
         max_alerts = config.get('signals', {}).get('max_alerts_per_scan', 3)
+        strategy = None
     
     try:
         from app.utils import get_ist_time
         current_time_str = get_ist_time().strftime('%H:%M:%S')
         
         logger.info("="*60)
-        logger.info(f"[{current_time_str}] Starting scan cycle ({period_name.upper()} period - min confidence: {min_confidence}%, max alerts: {max_alerts})...")
+        alerter.retry_pending()
+        alerter.begin_batch()
+        logger.info(f"[{current_time_str}] Starting scan cycle ({period_name.upper()} period - min confidence: {min_confidence}%, max alerts: {max_alerts}, strategy: {strategy or 'default'})...")
         
-        coins = load_futures_coins(config['scanner']['coins_file'])
-        logger.info(f"Loaded {len(coins)} futures pairs to scan")
+        universe.refresh()
+        logger.info(f"Scanning {len(universe)} futures pairs (universe v{universe.version})")
         
         logger.info("Fetching price data from CoinDCX API...")
-        price_data_batch = scanner.get_bulk_price_data(coins)
+        snapshot = scanner.fetch_snapshot(universe)
         
-        if not price_data_batch:
+        if snapshot is None or snapshot.count == 0:
             logger.warning("No price data received from API - skipping this cycle")
-            return
+            return False
+        
+        if position_tracker is not None and len(position_tracker):
+            exits = position_tracker.update(daily_stats)
+            if exits:
+                logger.info(f"Position tracker: {len(exits)} exits, {len(position_tracker)} positions still open")
         
-        logger.info(f"Received data for {len(price_data_batch)} coins")
+        fetch_stats = scanner.last_fetch_stats
+        logger.info(f"Received data for {snapshot.count} coins (TTFB {fetch_stats.get('ttfb_ms', 0):.0f}ms, download {fetch_stats.get('download_ms', 0):.0f}ms, parse {fetch_stats.get('parse_ms', 0):.1f}ms)")
         
-        coins_with_history = 0
-        coins_analyzed = 0
-        signals = []
         history_status = {}
         
-        for coin_symbol, price_data in price_data_batch.items():
-            current_history = len(scanner.get_price_history(coin_symbol))
-            
-            if current_history < 20:
-                if coin_symbol in ['BTC', 'ETH', 'SOL', 'BNB', 'XRP']:
-                    history_status[coin_symbol] = current_history
-                continue
-            
-            coins_with_history += 1
-            
-            price_history = scanner.get_price_history(coin_symbol)
-            volume_history = scanner.get_volume_history(coin_symbol)
-            
-            analysis = indicators.analyze_coin(
-                price_history,
-                price_data['volume'],
-                volume_history
-            )
-            
-            if analysis.get('has_data'):
-                coins_analyzed += 1
-            
-            signal = signal_generator.generate_signal(coin_symbol, price_data, analysis, min_confidence=min_confidence)
-            
-            if signal:
-                signals.append(signal)
-                logger.info(f"  ✓ Signal found: {coin_symbol} ({signal['direction']}, {signal['confidence']}% confidence)")
+        for coin_symbol in ['BTC', 'ETH', 'SOL', 'BNB', 'XRP']:
+            current_history = scanner.get_history_length(coin_symbol)
+            if 0 < current_history < 20:
+                history_status[coin_symbol] = current_history
+        
+        ready_index = np.flatnonzero(scanner.ready_mask(snapshot, min_periods=20))
+        coins_with_history = len(ready_index)
+        
+        if universe_fraction < 1.0 and coins_with_history:
+            limit = max(1, int(np.ceil(coins_with_history * universe_fraction)))
+            start = scan_offset % coins_with_history
+            ready_index = np.roll(ready_index, -start)[:limit]
+            scan_offset = start + limit
+            logger.info(f"Scan budget: analyzing {limit}/{coins_with_history} coins this cycle (rotating)")
+        
+        ready_rows = snapshot.rows[ready_index]
+        streaming = isinstance(indicators, StreamingIndicators)
+        
+        if not streaming:
+            price_matrix, volume_matrix = scanner.get_history_matrices(ready_rows, periods=20)
+        if prescreen is not None and len(ready_rows):
+            if streaming:
+                candidates = prescreen.screen_streaming(indicators, ready_rows)
+            else:
+                candidates = prescreen.screen(price_matrix, volume_matrix)
+                price_matrix, volume_matrix = price_matrix[candidates], volume_matrix[candidates]
+            ready_index = ready_index[candidates]
+            ready_rows = ready_rows[candidates]
+        
+        needs_deferred = None
+        if streaming:
+            results = indicators.analyze_rows(ready_rows)
+        else:
+            if config['signals']['indicators'].get('lazy_evaluation', False):
+                needs_deferred = lambda partial, computed: signal_generator.can_reach(partial, computed, min_confidence, strategy)
+            results = indicators.analyze_universe(price_matrix, volume_matrix, needs_deferred=needs_deferred)
+        coins_analyzed = int(results['has_data'].sum())
+        
+        signals = signal_generator.generate_signals(
+            snapshot, ready_index, results,
+            min_confidence=min_confidence,
+            max_signals=max_alerts,
+            strategy=strategy,
+            skipped=indicators.last_skipped if needs_deferred is not None else None
+        )
+        for signal in signals:
+            logger.info(f"  ✓ Signal found: {signal['symbol']} ({signal['direction']}, {signal['confidence']}% confidence)")
+        
+        if coins_with_history:
+            funnel = signal_generator.last_stats
+            screened = prescreen.last_stats.get('pruned', 0) if prescreen is not None else 0
+            lazy_skipped = funnel.get('lazy_skipped', 0)
+            logger.info(f"Pipeline: {snapshot.count} coins -> {coins_with_history} with history -> "
+                        f"{len(ready_rows)} after pre-screen (-{screened}) -> "
+                        f"{len(ready_rows) - lazy_skipped} fully analyzed (-{lazy_skipped} MACD/BB skipped) -> "
+                        f"{len(ready_rows) - lazy_skipped - funnel.get('no_data', 0) - funnel.get('neutral', 0)} directional "
+                        f"(no data -{funnel.get('no_data', 0)}, neutral -{funnel.get('neutral', 0)}) -> "
+                        f"{funnel.get('signals', 0)} signals (cooldown -{funnel.get('cooldown', 0)}, "
+                        f"confidence -{funnel.get('low_confidence', 0)}, too slow -{funnel.get('too_slow', 0)}, "
+                        f"risk:reward -{funnel.get('risk_reward', 0)})")
         
         if history_status and coins_with_history == 0:
             status_str = ", ".join([f"{coin}:{count}/20" for coin, count in list(history_status.items())[:5]])
@@ -232,14 +317,17 @@ def scan_and_signal():
             logger.info(f"⏳ Need 20 data points per coin (currently at scan #{list(history_status.values())[0]}/20)")
             logger.info(f"⏰ Estimated time to first analysis: {(20 - list(history_status.values())[0]) * 5} seconds")
         
-        logger.info(f"Analysis complete: {coins_analyzed}/{len(price_data_batch)} coins analyzed, {coins_with_history} with sufficient history")
+        logger.info(f"Analysis complete: {coins_analyzed}/{snapshot.count} coins analyzed, {coins_with_history} with sufficient history")
         
         if signals:
-            logger.info(f"Found {len(signals)} potential signals")
-            top_signals = signal_generator.filter_top_signals(signals, max_alerts=max_alerts)
+            logger.info(f"Found {signal_generator.last_stats['signals']} potential signals")
+            top_signals = signals
             
             logger.info(f"Sending top {len(top_signals)} signals ({period_name.upper()} period):")
             
+            if account_manager:
+                account_manager.ensure_snapshot()
+            
             for signal in top_signals:
                 daily_stats['total_signals'] += 1
                 
@@ -247,9 +335,8 @@ def scan_and_signal():
                 
                 account_info = None
                 if account_manager:
-                    logger.info(f"    Checking account margin...")
-                    account_manager.refresh_account_data()
                     account_info = account_manager.get_account_summary()
+                    logger.info(f"    Checking account margin (snapshot {account_manager.snapshot_age or 0:.0f}s old)...")
                     
                     adjusted_size = account_manager.calculate_dynamic_position_size(
                         signal['entry_price'],
@@ -271,7 +358,12 @@ def scan_and_signal():
                 
                 logger.info(f"    ✓ Sending alert to Discord...")
                 alerter.send_entry_signal(signal, account_info)
+                if position_tracker is not None:
+                    position_tracker.open(signal, daily_stats)
                 risk_manager.add_position(signal)
+                if account_manager:
+                    account_manager.reserve_margin(signal['symbol'], signal['direction'], signal['position_size'])
+                    account_manager.invalidate()
                 
                 logger.info(f"  ✅ Signal sent: {signal['symbol']} {signal['direction']} at ₹{signal['entry_price']:.2f}")
             
@@ -283,6 +375,11 @@ def scan_and_signal():
         
     except Exception as e:
         logger.error(f"Error in scan_and_signal: {e}", exc_info=True)
+    finally:
+        alerter.flush_batch()
+        signal_generator.cooldowns.save()
+        scanner.checkpoint_if_due()
+    return True
 
 def main():
     if not initialize_system():
@@ -331,12 +428,16 @@ def main():
         id='stop_session'
     )
     
+    global scan_scheduler
     scan_interval = config['scanner']['interval_seconds']
-    scheduler.add_job(
+    scheduling_config = config['scanner'].get('scheduling', {})
+    scan_scheduler = ScanScheduler(
         scan_and_signal,
-        'interval',
-        seconds=scan_interval,
-        id='scanner'
+        scan_interval,
+        policy=scheduling_config.get('overrun_policy', 'skip'),
+        budget_seconds=scheduling_config.get('budget_seconds'),
+        min_universe_fraction=scheduling_config.get('min_universe_fraction', 0.25),
+        stats_log_cycles=scheduling_config.get('stats_log_cycles', 60)
     )
     
     logger.info("Scheduler configured:")
@@ -346,7 +447,9 @@ def main():
     else:
         logger.info(f"  - Trading session starts: {trading_hours['start_time']} IST")
         logger.info(f"  - Trading session ends: {trading_hours['end_time']} IST")
-    logger.info(f"  - Scan interval: {scan_interval} seconds")
+    logger.info(f"  - Scan interval: {scan_interval} seconds (wall-clock aligned, overrun policy: {scan_scheduler.policy})")
+    if scanner.checkpoint_enabled:
+        logger.info(f"  - History checkpoint: every {scanner.checkpoint_interval} seconds to {scanner.checkpoint_file}")
     logger.info(f"  - Active days: {', '.join([day.capitalize() for day in days_list])}")
     
     if is_trading_hours(config):
@@ -355,13 +458,22 @@ def main():
     else:
         logger.info("Outside trading hours, waiting for next session...")
     
+    process_signal.signal(process_signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
     try:
         logger.info("System running... Press Ctrl+C to stop")
+        scan_scheduler.start()
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
         logger.info("Shutting down gracefully...")
+        scan_scheduler.stop(timeout=scan_interval)
+        if account_manager:
+            account_manager.stop_background_refresh(timeout=5)
         if trading_active:
             stop_trading_session()
+        scanner.save_history_checkpoint()
+        signal_generator.cooldowns.save()
+        alerter.close()
 
 if __name__ == "__main__":
     main()
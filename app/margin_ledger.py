@@ -0,0 +1,69 @@
+import time
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MarginLedger:
+    # Margin committed locally by accepted signals that the exchange snapshot does not show yet.
+    def __init__(self, ttl_seconds: float = 120):
+        self.ttl = ttl_seconds
+        self.reservations: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.reconciled = 0
+        self.expired = 0
+
+    @staticmethod
+    def key(symbol: str, direction: str) -> str:
+        return f"{symbol}_{direction}"
+
+    def reserve(self, symbol: str, direction: str, amount: float):
+        with self._lock:
+            self.reservations[self.key(symbol, direction)] = {
+                'symbol': symbol,
+                'direction': direction,
+                'amount': amount,
+                'created_at': time.monotonic(),
+                'reserved_at': time.time()
+            }
+
+    def release(self, symbol: str, direction: str) -> bool:
+        with self._lock:
+            return self.reservations.pop(self.key(symbol, direction), None) is not None
+
+    @property
+    def reserved(self) -> float:
+        with self._lock:
+            return sum(reservation['amount'] for reservation in self.reservations.values())
+
+    @property
+    def count(self) -> int:
+        return len(self.reservations)
+
+    def available(self, exchange_available: float) -> float:
+        return max(0.0, exchange_available - self.reserved)
+
+    def reconcile(self, exchange_orders: Iterable[Tuple[str, str, Optional[float]]]):
+        # Orders are (symbol, direction, placed_at epoch seconds or None). A reservation whose order now
+        # shows on the exchange (same coin and side, placed after the reservation) is covered by its
+        # locked margin; the rest expire after the TTL (the signal was never acted on).
+        newest: Dict[str, float] = {}
+        for symbol, direction, placed_at in exchange_orders:
+            key = self.key(symbol, direction)
+            # An order without a timestamp matches any reservation on its side.
+            placed_at = float('inf') if placed_at is None else placed_at
+            newest[key] = max(newest.get(key, placed_at), placed_at)
+        now = time.monotonic()
+        with self._lock:
+            for key, reservation in list(self.reservations.items()):
+                if newest.get(key, float('-inf')) >= reservation['reserved_at']:
+                    del self.reservations[key]
+                    self.reconciled += 1
+                elif now - reservation['created_at'] > self.ttl:
+                    del self.reservations[key]
+                    self.expired += 1
+            remaining = len(self.reservations)
+
+        if remaining:
+            logger.debug(f"Margin ledger: {remaining} reservations outstanding after reconcile")
@@ -0,0 +1,85 @@
+import heapq
+import itertools
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+class PositionBook:
+    # Positions keyed by (symbol, direction) plus a min-heap of entry times.
+    # Heap entries are removed lazily: a popped entry only counts if it still matches the live position.
+    def __init__(self):
+        self._positions: Dict[Tuple[str, str], Dict] = {}
+        self._by_symbol: Dict[str, Dict[str, Dict]] = {}
+        self._expiry_heap: List[Tuple[datetime, int, Tuple[str, str]]] = []
+        self._sequence = itertools.count()
+        self._entry_ids: Dict[Tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(list(self._positions.values()))
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._positions
+
+    def values(self) -> List[Dict]:
+        return list(self._positions.values())
+
+    def add(self, position: Dict) -> Optional[Dict]:
+        key = (position['symbol'], position['direction'])
+        replaced = self._pop(key)
+
+        entry_id = next(self._sequence)
+        self._positions[key] = position
+        self._by_symbol.setdefault(key[0], {})[key[1]] = position
+        self._entry_ids[key] = entry_id
+        heapq.heappush(self._expiry_heap, (position['entry_time'], entry_id, key))
+        self._compact()
+        return replaced
+
+    def get(self, symbol: str, direction: Optional[str] = None) -> Optional[Dict]:
+        if direction is not None:
+            return self._positions.get((symbol, direction))
+        positions = self._by_symbol.get(symbol)
+        if not positions:
+            return None
+        return next(iter(positions.values()))
+
+    def remove(self, symbol: str, direction: Optional[str] = None) -> List[Dict]:
+        if direction is not None:
+            removed = self._pop((symbol, direction))
+            return [removed] if removed else []
+        directions = list(self._by_symbol.get(symbol, {}))
+        return [self._pop((symbol, side)) for side in directions]
+
+    def expire(self, cutoff: datetime) -> List[Dict]:
+        expired = []
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= cutoff:
+            _, entry_id, key = heapq.heappop(heap)
+            if self._entry_ids.get(key) == entry_id:
+                expired.append(self._pop(key))
+        return expired
+
+    def next_expiry(self) -> Optional[datetime]:
+        heap = self._expiry_heap
+        while heap and self._entry_ids.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def _pop(self, key: Tuple[str, str]) -> Optional[Dict]:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return None
+        self._entry_ids.pop(key, None)
+        by_direction = self._by_symbol[key[0]]
+        del by_direction[key[1]]
+        if not by_direction:
+            del self._by_symbol[key[0]]
+        return position
+
+    def _compact(self):
+        # Rebuild once stale heap entries from replaced/removed positions dominate.
+        if len(self._expiry_heap) > 2 * len(self._positions) + 64:
+            self._expiry_heap = [entry for entry in self._expiry_heap if self._entry_ids.get(entry[2]) == entry[1]]
+            heapq.heapify(self._expiry_heap)
@@ -0,0 +1,260 @@
+import time
+import logging
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EXIT_TARGET = 'target'
+EXIT_STOP = 'stop_loss'
+EXIT_EXPIRY = 'expiry'
+EXIT_REPLACED = 'replaced'
+
+class PositionTracker:
+    # Open positions as parallel arrays (one slot per position) checked against the latest
+    # prices in a single pass per tick; Python only touches positions that actually exit.
+    def __init__(self, config, store, risk_manager, alerter=None, initial_capacity: int = 64):
+        self.config = config
+        self.store = store
+        self.risk_manager = risk_manager
+        self.alerter = alerter
+
+        risk_config = config['risk']
+        self.expiry_seconds = risk_config.get('position_expiry_minutes', 5) * 60
+        self.fee_fraction = risk_config.get('transaction_cost_percent', 0) / 100
+
+        personalized = config.get('personalized', {})
+        self.update_interval = personalized.get('update_interval_minutes', 1) * 60
+        self.send_updates = (config.get('mode') == 'personalized' and personalized.get('enabled', False)
+                             and personalized.get('send_position_updates', False))
+        self.last_update_sent = time.time()
+
+        self.keys: List[Optional[tuple]] = []
+        self.slot_index: Dict[tuple, int] = {}
+        self.free_slots: List[int] = []
+        self.events = {EXIT_TARGET: 0, EXIT_STOP: 0, EXIT_EXPIRY: 0, EXIT_REPLACED: 0}
+        self._allocate(initial_capacity, 2)
+
+    def _allocate(self, capacity: int, max_targets: int):
+        old_capacity = len(self.keys)
+        arrays = {
+            'rows': (np.int64, 0),
+            'side': (np.float64, 0.0),
+            'entry': (np.float64, np.nan),
+            'last_price': (np.float64, np.nan),
+            'stop': (np.float64, np.nan),
+            'size': (np.float64, 0.0),
+            'leverage': (np.float64, 0.0),
+            'opened': (np.float64, 0.0),
+            'remaining': (np.float64, 0.0),
+            'realized': (np.float64, 0.0),
+            'next_target': (np.int64, 0),
+            'active': (bool, False)
+        }
+        for name, (dtype, fill) in arrays.items():
+            grown = np.full(capacity, fill, dtype=dtype)
+            if old_capacity:
+                grown[:old_capacity] = getattr(self, name)
+            setattr(self, name, grown)
+
+        for name in ('targets', 'target_fractions'):
+            grown = np.full((capacity, max_targets), np.nan)
+            if old_capacity:
+                previous = getattr(self, name)
+                grown[:old_capacity, :previous.shape[1]] = previous
+            setattr(self, name, grown)
+
+        self.keys.extend([None] * (capacity - old_capacity))
+        self.free_slots.extend(range(capacity - 1, old_capacity - 1, -1))
+
+    def __len__(self) -> int:
+        return len(self.slot_index)
+
+    def open(self, signal: Dict, daily_stats: Optional[Dict] = None) -> List[Dict]:
+        # A new signal for an already tracked (symbol, direction) closes the old position at the
+        # new entry price first, so its P&L is recorded; call before RiskManager.add_position.
+        coin_id = signal.get('coin_id')
+        if coin_id is None:
+            coin_id = self.store.get_row(signal['symbol'])
+        if coin_id is None:
+            logger.warning(f"Cannot track {signal['symbol']}: no price history row")
+            return []
+
+        key = (signal['symbol'], signal['direction'])
+        events = []
+        if key in self.slot_index:
+            events = self._close_at(np.array([self.slot_index[key]]), np.array([float(signal['entry_price'])]), EXIT_REPLACED)
+            self._record(events, daily_stats)
+
+        targets = signal['targets']
+        if len(targets) > self.targets.shape[1]:
+            self._allocate(len(self.keys), len(targets))
+        if not self.free_slots:
+            self._allocate(len(self.keys) * 2, self.targets.shape[1])
+        slot = self.free_slots.pop()
+
+        self.keys[slot] = key
+        self.slot_index[key] = slot
+        self.rows[slot] = coin_id
+        self.side[slot] = 1.0 if signal['direction'] == 'LONG' else -1.0
+        self.entry[slot] = signal['entry_price']
+        self.last_price[slot] = signal['entry_price']
+        self.stop[slot] = signal['stop_loss']
+        self.size[slot] = signal['position_size']
+        self.leverage[slot] = signal['leverage']
+        self.opened[slot] = signal['timestamp'].timestamp()
+        self.remaining[slot] = 1.0
+        self.realized[slot] = 0.0
+        self.next_target[slot] = 0
+        self.active[slot] = True
+
+        self.targets[slot] = np.nan
+        self.target_fractions[slot] = np.nan
+        self.targets[slot, :len(targets)] = [target['price'] for target in targets]
+        fractions = [target['exit_percent'] / 100 for target in targets]
+        if fractions:
+            fractions[-1] = 1.0
+        self.target_fractions[slot, :len(targets)] = fractions
+        return events
+
+    def update(self, daily_stats: Optional[Dict] = None, now: Optional[float] = None) -> List[Dict]:
+        slots = np.flatnonzero(self.active)
+        if not len(slots):
+            return []
+
+        now = time.time() if now is None else now
+        prices = self.store.latest(self.rows[slots], 'prices')
+        valid = np.isfinite(prices) & (prices > 0)
+        self.last_price[slots[valid]] = prices[valid]
+        side = self.side[slots]
+
+        stop_hit = valid & (side * (prices - self.stop[slots]) <= 0)
+        with np.errstate(invalid='ignore'):
+            crossed = side[:, None] * (prices[:, None] - self.targets[slots]) >= 0
+        reached = crossed.sum(axis=1)
+        target_hit = valid & ~stop_hit & (reached > self.next_target[slots])
+        # Expiry does not need a fresh price: coins that stopped quoting close at their last valid price.
+        expired = ~stop_hit & ~target_hit & (now - self.opened[slots] >= self.expiry_seconds)
+        prices = self.last_price[slots]
+
+        events = []
+        if target_hit.any():
+            events.extend(self._take_targets(slots[target_hit], reached[target_hit]))
+        for mask, reason in ((stop_hit, EXIT_STOP), (expired, EXIT_EXPIRY)):
+            if mask.any():
+                events.extend(self._close_at(slots[mask], prices[mask], reason))
+
+        if events:
+            self._record(events, daily_stats)
+        if self.send_updates and now - self.last_update_sent >= self.update_interval:
+            self._send_updates(now)
+        return events
+
+    def _pnl(self, slots: np.ndarray, fractions: np.ndarray, exit_prices: np.ndarray) -> np.ndarray:
+        exposure = self.size[slots] * self.leverage[slots] * fractions
+        move = self.side[slots] * (exit_prices - self.entry[slots]) / self.entry[slots]
+        return exposure * move - self.size[slots] * fractions * self.fee_fraction
+
+    def _take_targets(self, slots: np.ndarray, reached: np.ndarray) -> List[Dict]:
+        # Each newly crossed target closes its share at the target price; the last closes the rest.
+        events = []
+        for level in range(self.targets.shape[1]):
+            hit = (self.next_target[slots] <= level) & (reached > level) & self.active[slots]
+            if not hit.any():
+                continue
+            hit_slots = slots[hit]
+            fractions = np.minimum(self.target_fractions[hit_slots, level], self.remaining[hit_slots])
+            exit_prices = self.targets[hit_slots, level]
+            pnl = self._pnl(hit_slots, fractions, exit_prices)
+            self.next_target[hit_slots] = level + 1
+            events.extend(self._apply_exit(hit_slots, fractions, exit_prices, pnl, f"{EXIT_TARGET} {level + 1}"))
+        return events
+
+    def _close_at(self, slots: np.ndarray, prices: np.ndarray, reason: str) -> List[Dict]:
+        fractions = self.remaining[slots].copy()
+        pnl = self._pnl(slots, fractions, prices)
+        return self._apply_exit(slots, fractions, prices, pnl, reason)
+
+    def _apply_exit(self, slots: np.ndarray, fractions: np.ndarray, exit_prices: np.ndarray,
+                    pnl: np.ndarray, reason: str) -> List[Dict]:
+        self.remaining[slots] -= fractions
+        self.realized[slots] += pnl
+        closed = self.remaining[slots] <= 1e-9
+
+        events = []
+        for slot, fraction, exit_price, amount, is_closed in zip(slots, fractions, exit_prices, pnl, closed):
+            symbol, direction = self.keys[slot]
+            margin = self.size[slot] * fraction
+            events.append({
+                'symbol': symbol,
+                'direction': direction,
+                'reason': reason,
+                'exit_price': float(exit_price),
+                'fraction': float(fraction),
+                'pnl': float(amount),
+                'pnl_percent': float(amount / margin * 100) if margin else 0.0,
+                'closed': bool(is_closed),
+                'total_pnl': float(self.realized[slot])
+            })
+            if is_closed:
+                self._release(slot)
+        return events
+
+    def _release(self, slot: int):
+        key = self.keys[slot]
+        self.active[slot] = False
+        self.keys[slot] = None
+        del self.slot_index[key]
+        self.free_slots.append(slot)
+        self.risk_manager.remove_position(*key)
+
+    def _record(self, events: List[Dict], daily_stats: Optional[Dict]):
+        for event in events:
+            self.events[event['reason'].split()[0]] += 1
+            logger.info(f"Exit {event['symbol']} {event['direction']} ({event['reason']}, {event['fraction']:.0%}) "
+                        f"at ₹{event['exit_price']:.4f}: P&L ₹{event['pnl']:.2f}")
+            if self.alerter:
+                self.alerter.send_exit_signal(event['symbol'], event['exit_price'], event['pnl'],
+                                              event['pnl_percent'], event['reason'])
+
+            if daily_stats is None:
+                continue
+            daily_stats['total_pnl'] += event['pnl']
+            if event['closed']:
+                daily_stats['trades_executed'] += 1
+                if event['total_pnl'] > 0:
+                    daily_stats['winning_trades'] += 1
+                else:
+                    daily_stats['losing_trades'] += 1
+                daily_stats['best_trade'] = max(daily_stats['best_trade'], event['total_pnl'])
+                daily_stats['worst_trade'] = min(daily_stats['worst_trade'], event['total_pnl'])
+
+    def _send_updates(self, now: float):
+        self.last_update_sent = now
+        slots = np.flatnonzero(self.active)
+        if not len(slots) or not self.alerter:
+            return
+        prices = self.last_price[slots]
+        pnl = self._pnl(slots, self.remaining[slots], prices) + self.realized[slots]
+        for slot, price, amount in zip(slots, prices, pnl):
+            symbol, direction = self.keys[slot]
+            position = {'symbol': symbol, 'direction': direction, 'entry_price': float(self.entry[slot])}
+            self.alerter.send_position_update(position, float(price), {
+                'pnl_amount': round(float(amount), 2),
+                'pnl_percent': round(float(amount / self.size[slot] * 100), 2)
+            })
+
+    def open_positions(self) -> List[Dict]:
+        slots = np.flatnonzero(self.active)
+        return [
+            {
+                'symbol': self.keys[slot][0],
+                'direction': self.keys[slot][1],
+                'entry_price': float(self.entry[slot]),
+                'remaining': float(self.remaining[slot]),
+                'realized_pnl': float(self.realized[slot]),
+                'opened': datetime.fromtimestamp(self.opened[slot])
+            }
+            for slot in slots
+        ]
@@ -0,0 +1,88 @@
+import logging
+import numpy as np
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+MOMENTUM_LOOKBACK = 5
+MOMENTUM_MIN_CHANGE = 0.5
+
+class PreScreen:
+    # A coin can only leave NEUTRAL if, besides MACD (which alone is one reason), at least one of
+    # RSI extreme, Bollinger band touch, strong momentum or a volume surge fires. The default
+    # thresholds are those trigger conditions relaxed by `margin`, so nothing that could signal is
+    # pruned; tighter overrides trade recall for speed.
+    def __init__(self, config):
+        indicator_config = config['signals']['indicators']
+        screen_config = config['signals'].get('prescreen', {})
+        slack = 1 - screen_config.get('margin', 0.05)
+
+        self.rsi_period = indicator_config['rsi_period']
+        self.bb_period = indicator_config['bb_period']
+
+        oversold = indicator_config['rsi_oversold'] / 100
+        overbought = indicator_config['rsi_overbought'] / 100
+        self.min_efficiency = screen_config.get('min_efficiency', min(1 - 2 * oversold, 2 * overbought - 1) * slack)
+        self.min_bb_z = screen_config.get('min_bb_z', 0.6 * indicator_config['bb_std'] * slack)
+        self.min_volume_ratio = screen_config.get('min_volume_ratio', indicator_config['volume_surge_multiplier'] * slack)
+        self.min_return_percent = screen_config.get('min_return_percent', MOMENTUM_MIN_CHANGE * slack)
+
+        self.totals = {'screened': 0, 'passed': 0}
+        self.last_stats: Dict[str, int] = {}
+
+    def screen(self, prices: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+        count = len(prices)
+        if count == 0 or prices.shape[1] < max(self.rsi_period + 1, self.bb_period, MOMENTUM_LOOKBACK):
+            self.last_stats = {'screened': count, 'passed': count, 'pruned': 0}
+            return np.ones(count, dtype=bool)
+
+        deltas = np.diff(prices[:, -(self.rsi_period + 1):], axis=1)
+        gains = np.where(deltas > 0, deltas, 0).sum(axis=1)
+        losses = np.where(deltas < 0, -deltas, 0).sum(axis=1)
+        window = prices[:, -self.bb_period:]
+        return self._evaluate(gains, losses, prices[:, -1], window.mean(axis=1), window.std(axis=1),
+                              prices[:, -MOMENTUM_LOOKBACK], volumes)
+
+    def screen_streaming(self, indicators, rows: np.ndarray) -> np.ndarray:
+        # Same checks from the running RSI/Bollinger sums of StreamingIndicators, so streaming
+        # scans never build price history matrices.
+        count = len(rows)
+        history = int(indicators.store.counts[rows].min()) if count else 0
+        if count == 0 or history < max(self.rsi_period + 1, self.bb_period, MOMENTUM_LOOKBACK):
+            self.last_stats = {'screened': count, 'passed': count, 'pruned': 0}
+            return np.ones(count, dtype=bool)
+
+        gains, losses, mean, std = indicators.screen_state(rows)
+        volumes = indicators.store.window_matrix(rows, min(history, indicators.volume_window), 'volumes')
+        return self._evaluate(gains, losses, indicators.store.latest(rows),
+                              mean, std, indicators.store.window_matrix(rows, MOMENTUM_LOOKBACK)[:, 0], volumes)
+
+    def _evaluate(self, gains: np.ndarray, losses: np.ndarray, price: np.ndarray, mean: np.ndarray,
+                  std: np.ndarray, start: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+        count = len(price)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            efficiency = np.abs(gains - losses) / (gains + losses)
+            rsi_extreme = (losses == 0) | (efficiency >= self.min_efficiency)
+
+            z_score = np.abs(price - mean) / std
+            band_touch = z_score >= self.min_bb_z
+
+            moving = np.abs(price - start) / start * 100 >= self.min_return_percent
+
+            average_volume = volumes[:, :-1].mean(axis=1)
+            volume_surge = volumes[:, -1] / average_volume >= self.min_volume_ratio
+
+        passed = rsi_extreme | band_touch | moving | volume_surge
+        kept = int(np.count_nonzero(passed))
+        self.last_stats = {
+            'screened': count,
+            'passed': kept,
+            'pruned': count - kept,
+            'rsi_extreme': int(np.count_nonzero(rsi_extreme)),
+            'band_touch': int(np.count_nonzero(band_touch)),
+            'momentum': int(np.count_nonzero(moving)),
+            'volume_surge': int(np.count_nonzero(volume_surge))
+        }
+        self.totals['screened'] += count
+        self.totals['passed'] += kept
+        return passed
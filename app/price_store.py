@@ -0,0 +1,174 @@
+import numpy as np
+import os
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+class PriceStore:
+    # Each row is written twice (slot and slot + capacity) so the newest N samples
+    # of any row are always one contiguous slice and can be returned as a view.
+    def __init__(self, capacity: int = 100, initial_rows: int = 512):
+        self.capacity = capacity
+        self.symbol_rows: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self._allocate(initial_rows)
+
+    def _allocate(self, rows: int):
+        width = 2 * self.capacity
+        self.prices = np.zeros((rows, width), dtype=np.float64)
+        self.volumes = np.zeros((rows, width), dtype=np.float64)
+        self.timestamps = np.zeros((rows, width), dtype=np.int64)
+        self.heads = np.full(rows, self.capacity - 1, dtype=np.int64)
+        self.counts = np.zeros(rows, dtype=np.int64)
+
+    def _grow(self, min_rows: int):
+        old_rows = self.prices.shape[0]
+        new_rows = max(min_rows, old_rows * 2)
+        prices, volumes, timestamps = self.prices, self.volumes, self.timestamps
+        heads, counts = self.heads, self.counts
+
+        self._allocate(new_rows)
+        self.prices[:old_rows] = prices
+        self.volumes[:old_rows] = volumes
+        self.timestamps[:old_rows] = timestamps
+        self.heads[:old_rows] = heads
+        self.counts[:old_rows] = counts
+        logger.debug(f"Price store grown from {old_rows} to {new_rows} rows")
+
+    @property
+    def size(self) -> int:
+        return len(self.symbols)
+
+    def row_for(self, symbol: str) -> int:
+        row = self.symbol_rows.get(symbol)
+        if row is None:
+            row = len(self.symbols)
+            if row >= self.prices.shape[0]:
+                self._grow(row + 1)
+            self.symbol_rows[symbol] = row
+            self.symbols.append(symbol)
+        return row
+
+    def rows_for(self, symbols: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.row_for(s) for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def get_row(self, symbol: str) -> Optional[int]:
+        return self.symbol_rows.get(symbol)
+
+    def append(self, row: int, price: float, volume: float, timestamp_ms: int):
+        slot = (self.heads[row] + 1) % self.capacity
+        for column in (slot, slot + self.capacity):
+            self.prices[row, column] = price
+            self.volumes[row, column] = volume
+            self.timestamps[row, column] = timestamp_ms
+        self.heads[row] = slot
+        if self.counts[row] < self.capacity:
+            self.counts[row] += 1
+
+    def append_many(self, rows: np.ndarray, prices: np.ndarray, volumes: np.ndarray, timestamp_ms: int):
+        if len(rows) == 0:
+            return
+        slots = (self.heads[rows] + 1) % self.capacity
+        for columns in (slots, slots + self.capacity):
+            self.prices[rows, columns] = prices
+            self.volumes[rows, columns] = volumes
+            self.timestamps[rows, columns] = timestamp_ms
+        self.heads[rows] = slots
+        self.counts[rows] = np.minimum(self.counts[rows] + 1, self.capacity)
+
+    def count(self, row: Optional[int]) -> int:
+        if row is None:
+            return 0
+        return int(self.counts[row])
+
+    def _window(self, buffer: np.ndarray, row: int, periods: Optional[int]) -> np.ndarray:
+        available = int(self.counts[row])
+        n = available if periods is None else min(periods, available)
+        end = int(self.heads[row]) + self.capacity + 1
+        return buffer[row, end - n:end]
+
+    def price_window(self, row: int, periods: Optional[int] = None) -> np.ndarray:
+        return self._window(self.prices, row, periods)
+
+    def volume_window(self, row: int, periods: Optional[int] = None) -> np.ndarray:
+        return self._window(self.volumes, row, periods)
+
+    def timestamp_window(self, row: int, periods: Optional[int] = None) -> np.ndarray:
+        return self._window(self.timestamps, row, periods)
+
+    def window_matrix(self, rows: np.ndarray, periods: int, field: str = 'prices') -> np.ndarray:
+        buffer = getattr(self, field)
+        columns = (self.heads[rows] + self.capacity + 1 - periods)[:, None] + np.arange(periods)
+        return buffer[rows[:, None], columns]
+
+    def latest(self, rows: np.ndarray, field: str = 'prices') -> np.ndarray:
+        buffer = getattr(self, field)
+        return buffer[rows, self.heads[rows]]
+
+    def drop_older_than(self, cutoff_ms: int) -> int:
+        active = self.size
+        if active == 0:
+            return 0
+
+        timestamps = self._chronological(self.timestamps)
+        valid = np.arange(self.capacity) >= (self.capacity - self.counts[:active])[:, None]
+        stale = np.count_nonzero(valid & (timestamps < cutoff_ms), axis=1)
+
+        self.counts[:active] -= stale
+        return int(stale.sum())
+
+    def _chronological(self, buffer: np.ndarray) -> np.ndarray:
+        active = self.size
+        columns = (self.heads[:active] + 1)[:, None] + np.arange(self.capacity)
+        return buffer[np.arange(active)[:, None], columns]
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        # Chronological copies of the live buffers; take it on the thread that appends.
+        return {
+            'symbols': np.array(self.symbols, dtype=str),
+            'counts': self.counts[:self.size].copy(),
+            'prices': self._chronological(self.prices),
+            'volumes': self._chronological(self.volumes),
+            'timestamps': self._chronological(self.timestamps)
+        }
+
+    def save(self, path: str, snapshot: Optional[Dict[str, np.ndarray]] = None):
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(target.name + '.tmp')
+
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **(snapshot if snapshot is not None else self.snapshot()))
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, target)
+
+    def load(self, path: str, min_timestamp_ms: Optional[int] = None) -> int:
+        with np.load(path, allow_pickle=False) as data:
+            symbols = [str(symbol) for symbol in data['symbols']]
+            if not symbols:
+                return 0
+
+            width = min(data['prices'].shape[1], self.capacity)
+            counts = np.minimum(data['counts'], width)
+            prices = data['prices'][:, -width:]
+            volumes = data['volumes'][:, -width:]
+            timestamps = data['timestamps'][:, -width:]
+
+        rows = self.rows_for(symbols)
+        for buffer, values in ((self.prices, prices), (self.volumes, volumes), (self.timestamps, timestamps)):
+            buffer[rows, :width] = values
+            buffer[rows, self.capacity:self.capacity + width] = values
+        self.heads[rows] = width - 1
+        self.counts[rows] = counts
+
+        if min_timestamp_ms is not None:
+            self.drop_older_than(min_timestamp_ms)
+
+        return int(self.counts[rows].sum())
+
+    def memory_bytes(self) -> int:
+        return self.prices.nbytes + self.volumes.nbytes + self.timestamps.nbytes + self.heads.nbytes + self.counts.nbytes
@@ -0,0 +1,64 @@
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float, name: str = "bucket"):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.name = name
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+        self.deferrals = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    if waited:
+                        self.waits += 1
+                        self.waited_seconds += now - started
+                    return True
+                else:
+                    wait = (1 - self.tokens) / self.rate
+
+            if timeout is not None and now + wait - started > timeout:
+                return False
+            waited = True
+            time.sleep(wait)
+
+    def defer(self, seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0
+            self._updated = now
+            self.deferrals += 1
+        logger.warning(f"{self.name} rate limited, pausing requests for {seconds:.2f}s")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'tokens': self.tokens,
+                'waits': self.waits,
+                'waited_seconds': self.waited_seconds,
+                'deferrals': self.deferrals
+            }
@@ -1,5 +1,8 @@
 import logging
+import numpy as np
+from datetime import datetime, timedelta
 from typing import Dict, Optional
+from app.position_book import PositionBook
 from app.utils import calculate_position_size
 
 logger = logging.getLogger(__name__)
@@ -14,7 +17,12 @@ class RiskManager:
         self.default_leverage = self.risk_config['default_leverage']
         self.transaction_cost = self.risk_config.get('transaction_cost_percent', 0)
         
-        self.active_positions = []
+        self.positions = PositionBook()
+        self._resolve_sizing_config()
+        
+    @property
+    def active_positions(self) -> list:
+        return self.positions.values()
         
     def calculate_position_size(self, entry_price: float, stop_loss: float, 
                                 leverage: Optional[int] = None, confidence: Optional[float] = None) -> float:
@@ -50,10 +58,81 @@ class RiskManager:
         
         return round(position_size, 2)
     
+    def _resolve_sizing_config(self):
+        risk_config = self.risk_config
+        self.stop_loss_percent = risk_config['stop_loss_percent']
+        self.min_risk_reward = risk_config['min_risk_reward_ratio']
+        
+        targets_config = risk_config['take_profit_targets']
+        self.target_percents = np.array([target['target'] for target in targets_config], dtype=np.float64)
+        self.target_exit_percents = [target['exit_percent'] for target in targets_config]
+        self.target_profit_percents = [target['target'] for target in targets_config]
+        
+        sizing = risk_config.get('position_sizing', {})
+        self.use_confidence_scaling = sizing.get('use_confidence_scaling', False)
+        self.confidence_tiers = np.array([91, 81, 71], dtype=np.float64)
+        self.tier_size_percents = np.array([
+            sizing.get('strong_size_percent', 30),
+            sizing.get('high_size_percent', 25),
+            sizing.get('moderate_size_percent', 20)
+        ], dtype=np.float64)
+        self.base_size_percent = sizing.get('base_size_percent', 15)
+        self.risk_amount = self.total_capital * (self.risk_per_trade / 100)
+    
+    def size_batch(self, entry_prices: np.ndarray, directions: np.ndarray,
+                   confidences: Optional[np.ndarray] = None, leverage: Optional[int] = None) -> Dict[str, np.ndarray]:
+        # Array form of calculate_stop_loss/calculate_targets/calculate_position_size/validate_signal.
+        # directions: +1 for LONG, -1 for SHORT.
+        if leverage is None:
+            leverage = self.default_leverage
+        entry = np.asarray(entry_prices, dtype=np.float64)
+        is_long = np.asarray(directions) > 0
+        
+        stop_loss = np.where(is_long, entry * (1 - self.stop_loss_percent / 100), entry * (1 + self.stop_loss_percent / 100))
+        target_fraction = self.target_percents / 100
+        targets = np.where(is_long[:, None], entry[:, None] * (1 + target_fraction), entry[:, None] * (1 - target_fraction))
+        
+        stop_distance = np.abs(entry - stop_loss) / entry * 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_size = (self.risk_amount / (stop_distance / 100)) / leverage
+        
+        if self.use_confidence_scaling and confidences is not None:
+            confidence = np.asarray(confidences, dtype=np.float64)
+            max_percent = np.select(
+                [confidence >= tier for tier in self.confidence_tiers],
+                self.tier_size_percents,
+                default=self.base_size_percent
+            )
+        else:
+            max_percent = np.full(len(entry), 20.0)
+        position_size = np.round(np.minimum(position_size, self.total_capital * (max_percent / 100)), 2)
+        
+        if targets.shape[1]:
+            target_distance = np.abs(targets[:, 0] - entry) / entry * 100
+            with np.errstate(divide='ignore', invalid='ignore'):
+                risk_reward = np.where(stop_distance > 0, target_distance / stop_distance, 0.0)
+        else:
+            risk_reward = np.zeros(len(entry))
+        
+        return {
+            'stop_loss': stop_loss,
+            'targets': targets,
+            'position_size': position_size,
+            'leverage': np.full(len(entry), leverage),
+            'risk_reward': risk_reward,
+            'valid': risk_reward >= self.min_risk_reward
+        }
+    
+    def target_ladder(self, target_prices: np.ndarray) -> list:
+        return [
+            {'price': float(price), 'exit_percent': exit_percent, 'profit_percent': profit_percent}
+            for price, exit_percent, profit_percent in zip(target_prices, self.target_exit_percents, self.target_profit_percents)
+        ]
+    
     def can_open_position(self) -> tuple[bool, str]:
         max_positions = self.risk_config['max_concurrent_positions']
         
-        if len(self.active_positions) >= max_positions:
+        if len(self.positions) >= max_positions:
             return False, f"Max concurrent positions reached ({max_positions})"
         
         return True, "OK"
@@ -106,34 +185,24 @@ class RiskManager:
             'targets': signal['targets'],
             'entry_time': signal['timestamp']
         }
-        self.active_positions.append(position)
+        replaced = self.positions.add(position)
+        if replaced:
+            logger.info(f"Position replaced: {signal['symbol']} {signal['direction']} (previous entry ₹{replaced['entry_price']})")
         logger.info(f"Position added: {signal['symbol']} {signal['direction']} at ₹{signal['entry_price']}")
     
-    def remove_position(self, symbol: str):
-        self.active_positions = [p for p in self.active_positions if p['symbol'] != symbol]
+    def remove_position(self, symbol: str, direction: Optional[str] = None):
+        self.positions.remove(symbol, direction)
         logger.info(f"Position removed: {symbol}")
     
     def get_active_positions(self) -> list:
-        return self.active_positions.copy()
+        return self.positions.values()
     
-    def get_position(self, symbol: str) -> Optional[Dict]:
-        for position in self.active_positions:
-            if position['symbol'] == symbol:
-                return position
-        return None
+    def get_position(self, symbol: str, direction: Optional[str] = None) -> Optional[Dict]:
+        return self.positions.get(symbol, direction)
     
     def cleanup_expired_positions(self, max_age_minutes: int = 5):
-        from datetime import datetime, timedelta
-        
         cutoff_time = datetime.now() - timedelta(minutes=max_age_minutes)
-        initial_count = len(self.active_positions)
-        
-        self.active_positions = [
-            p for p in self.active_positions 
-            if p['entry_time'] > cutoff_time
-        ]
-        
-        removed = initial_count - len(self.active_positions)
+        removed = len(self.positions.expire(cutoff_time))
         if removed > 0:
             logger.info(f"Auto-cleanup: Removed {removed} expired positions (>{max_age_minutes} min old)")
         
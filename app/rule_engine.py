@@ -0,0 +1,260 @@
+import ast
+import logging
+import numpy as np
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from app.indicator_core import TREND_BULLISH, TREND_BEARISH, TREND_NEUTRAL
+from app.indicator_registry import available_fields
+
+logger = logging.getLogger(__name__)
+
+SIDES = {'long': 1, 'short': -1, 'follow': 0}
+
+TREND_CONSTANTS = {'bullish': TREND_BULLISH, 'bearish': TREND_BEARISH, 'neutral': TREND_NEUTRAL}
+
+FUNCTIONS = {
+    'min': lambda *args: _reduce(np.minimum, args),
+    'max': lambda *args: _reduce(np.maximum, args),
+    'abs': np.abs
+}
+
+COMPARISONS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal
+}
+
+ARITHMETIC = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide
+}
+
+DEFAULT_RULES = [
+    {'group': 'rsi', 'when': 'rsi < rsi_oversold', 'direction': 'long', 'weight': 25, 'reason': 'RSI({rsi:.1f}) Oversold'},
+    {'group': 'rsi', 'when': 'rsi > rsi_overbought', 'direction': 'short', 'weight': 25, 'reason': 'RSI({rsi:.1f}) Overbought'},
+    {'group': 'macd', 'when': 'bullish_crossover', 'direction': 'long', 'weight': 20, 'reason': 'MACD Bullish Crossover'},
+    {'group': 'macd', 'when': 'bearish_crossover', 'direction': 'short', 'weight': 20, 'reason': 'MACD Bearish Crossover'},
+    {'group': 'macd', 'when': 'macd_histogram > 0', 'direction': 'long', 'weight': 10, 'reason': 'MACD Positive'},
+    {'group': 'macd', 'when': 'macd_histogram < 0', 'direction': 'short', 'weight': 10, 'reason': 'MACD Negative'},
+    {'group': 'bb', 'when': 'bb_at_lower', 'direction': 'long', 'weight': 15, 'reason': 'BB Lower Band Bounce'},
+    {'group': 'bb', 'when': 'bb_at_upper', 'direction': 'short', 'weight': 15, 'reason': 'BB Upper Band Rejection'},
+    {'group': 'volume', 'when': 'volume_surge', 'direction': 'follow', 'weight': 'min(30, volume_multiplier * 10)',
+     'reason': 'Volume Surge ({volume_multiplier:.1f}x)'},
+    {'group': 'momentum', 'when': 'momentum_trend == bullish and momentum_strength > 0.5', 'direction': 'long',
+     'weight': 15, 'reason': 'Bullish Momentum ({momentum_change:.2f}%)'},
+    {'group': 'momentum', 'when': 'momentum_trend == bearish and momentum_strength > 0.5', 'direction': 'short',
+     'weight': 15, 'reason': 'Bearish Momentum ({momentum_change:.2f}%)'}
+]
+
+def _reduce(function, args):
+    result = args[0]
+    for arg in args[1:]:
+        result = function(result, arg)
+    return result
+
+def expression_fields(source, fields: Set[str]) -> Set[str]:
+    if isinstance(source, (int, float)):
+        return set()
+    tree = ast.parse(str(source), mode='eval')
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and node.id in fields}
+
+def compile_expression(source, parameters: Dict[str, float], fields: Set[str]) -> Callable[[np.ndarray], np.ndarray]:
+    # Expressions may reference indicator result fields, numeric indicator settings, the trend
+    # names, numbers, comparisons, and/or/not, + - * / and min/max/abs. Anything else is rejected.
+    if isinstance(source, (int, float)):
+        return lambda results, value=source: value
+    tree = ast.parse(str(source), mode='eval')
+    return _compile_node(tree.body, parameters, fields, str(source))
+
+def _compile_node(node, parameters: Dict[str, float], fields: Set[str], source: str) -> Callable:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+        return lambda results, value=node.value: value
+
+    if isinstance(node, ast.Name):
+        if node.id in fields:
+            return lambda results, field=node.id: results[field]
+        if node.id in parameters:
+            return lambda results, value=parameters[node.id]: value
+        if node.id in TREND_CONSTANTS:
+            return lambda results, value=TREND_CONSTANTS[node.id]: value
+        raise ValueError(f"Unknown name '{node.id}' in rule expression: {source}")
+
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_node(value, parameters, fields, source) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return lambda results: _reduce(combine, [operand(results) for operand in operands])
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        operand = _compile_node(node.operand, parameters, fields, source)
+        if isinstance(node.op, ast.Not):
+            return lambda results: np.logical_not(operand(results))
+        return lambda results: np.negative(operand(results))
+
+    if isinstance(node, ast.Compare) and all(type(op) in COMPARISONS for op in node.ops):
+        terms = [_compile_node(term, parameters, fields, source) for term in [node.left] + node.comparators]
+        operators = [COMPARISONS[type(op)] for op in node.ops]
+
+        def compare(results):
+            values = [term(results) for term in terms]
+            checks = [operator(values[i], values[i + 1]) for i, operator in enumerate(operators)]
+            return _reduce(np.logical_and, checks)
+        return compare
+
+    if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC:
+        left = _compile_node(node.left, parameters, fields, source)
+        right = _compile_node(node.right, parameters, fields, source)
+        operator = ARITHMETIC[type(node.op)]
+        return lambda results: operator(left(results), right(results))
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+            and node.args and not node.keywords):
+        function = FUNCTIONS[node.func.id]
+        arguments = [_compile_node(arg, parameters, fields, source) for arg in node.args]
+        return lambda results: function(*[argument(results) for argument in arguments])
+
+    raise ValueError(f"Unsupported syntax '{ast.dump(node)}' in rule expression: {source}")
+
+class Strategy:
+    # Rules sharing a group are exclusive (first match wins) and groups fire in config order.
+    # 'follow' rules vote with whichever side leads once all directional rules have voted.
+    # Confidence sums the weights of the first N fired groups, N being the winning side's votes.
+    def __init__(self, name: str, strategy_config: Dict, parameters: Dict[str, float], fields: Set[str]):
+        self.name = name
+        self.min_votes = strategy_config.get('min_votes', 2)
+        self.max_confidence = strategy_config.get('max_confidence', 100)
+        rule_configs = strategy_config.get('rules') or DEFAULT_RULES
+        self.uses_default_rules = list(rule_configs) == DEFAULT_RULES and self.min_votes >= 2
+
+        self.groups: List[List[Dict]] = []
+        group_index = {}
+        for position, rule_config in enumerate(rule_configs):
+            direction = str(rule_config.get('direction', 'long')).lower()
+            if direction not in SIDES:
+                raise ValueError(f"Rule {position + 1} of strategy '{name}': direction must be long, short or follow")
+            rule = {
+                'when': compile_expression(rule_config['when'], parameters, fields),
+                'weight': compile_expression(rule_config.get('weight', 0), parameters, fields),
+                'side': SIDES[direction],
+                'fields': expression_fields(rule_config['when'], fields) | expression_fields(rule_config.get('weight', 0), fields),
+                'weight_fields': expression_fields(rule_config.get('weight', 0), fields),
+                'reason': rule_config.get('reason', rule_config['when'])
+            }
+            group = rule_config.get('group', f"rule_{position}")
+            if group not in group_index:
+                group_index[group] = len(self.groups)
+                self.groups.append([])
+            self.groups[group_index[group]].append(rule)
+
+    def _fire_group(self, rules: List[Dict], results: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        count = len(results)
+        fired = np.full(count, -1, dtype=np.int64)
+        weights = np.zeros(count)
+        sides = np.zeros(count, dtype=np.int64)
+        for r, rule in enumerate(rules):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                hit = np.broadcast_to(rule['when'](results), (count,)) & (fired < 0)
+                weight = rule['weight'](results)
+            fired = np.where(hit, r, fired)
+            weights = np.where(hit, weight, weights)
+            sides = np.where(hit, rule['side'], sides)
+        return fired, weights, sides
+
+    def _fire(self, results: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        fired, weights, sides = zip(*(self._fire_group(rules, results) for rules in self.groups))
+        return np.array(fired), np.array(weights), np.array(sides)
+
+    def can_reach(self, results: np.ndarray, computed_fields: Set[str], threshold: float) -> np.ndarray:
+        # Upper bound on confidence and votes when only `computed_fields` are filled in: groups
+        # depending on anything else are assumed to fire for both sides with their largest weight.
+        count = len(results)
+        potential = np.zeros(count)
+        long_votes = np.zeros(count, dtype=np.int64)
+        short_votes = np.zeros(count, dtype=np.int64)
+        for rules in self.groups:
+            if all(rule['fields'] <= computed_fields for rule in rules):
+                fired, weights, sides = self._fire_group(rules, results)
+                present = fired >= 0
+                long_votes += present & (sides >= 0)
+                short_votes += present & (sides <= 0)
+            else:
+                weights = np.full(count, -np.inf)
+                for rule in rules:
+                    if rule['weight_fields'] <= computed_fields:
+                        with np.errstate(invalid='ignore', divide='ignore'):
+                            weight = np.broadcast_to(rule['weight'](results), (count,))
+                    else:
+                        weight = np.inf
+                    weights = np.maximum(weights, weight)
+                present = np.ones(count, dtype=bool)
+                long_votes += 1
+                short_votes += 1
+            potential += np.where(present, np.where(np.isnan(weights), np.inf, np.maximum(weights, 0)), 0)
+
+        reachable_votes = (long_votes >= self.min_votes) | (short_votes >= self.min_votes)
+        return reachable_votes & (np.minimum(self.max_confidence, potential) >= threshold)
+
+    def score(self, results: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        fired, weights, sides = self._fire(results)
+        present = fired >= 0
+
+        buy_votes = np.count_nonzero(present & (sides > 0), axis=0)
+        sell_votes = np.count_nonzero(present & (sides < 0), axis=0)
+        for follows in present & (sides == 0):
+            buy_votes, sell_votes = buy_votes + (follows & (buy_votes > sell_votes)), sell_votes + (follows & (sell_votes > buy_votes))
+
+        direction = np.where((buy_votes > sell_votes) & (buy_votes >= self.min_votes), 1,
+                             np.where((sell_votes > buy_votes) & (sell_votes >= self.min_votes), -1, 0))
+        votes = np.where(direction > 0, buy_votes, sell_votes)
+
+        total = np.zeros(len(results))
+        counted = np.zeros(len(results), dtype=np.int64)
+        for g in range(len(self.groups)):
+            total += np.where(present[g] & (counted < votes), weights[g], 0)
+            counted += present[g]
+        confidence = np.where(direction != 0, np.minimum(self.max_confidence, total), 0)
+        return direction, confidence
+
+    def reasons(self, result: np.void, direction: int) -> List[str]:
+        fired, _, sides = self._fire(np.array([result], dtype=result.dtype))
+        values = {name: result[name].item() for name in result.dtype.names}
+        directional = []
+        followers = []
+        for g, rules in enumerate(self.groups):
+            r = fired[g, 0]
+            if r < 0:
+                continue
+            side = sides[g, 0]
+            if side == direction:
+                directional.append(rules[r]['reason'].format(**values))
+            elif side == 0:
+                followers.append(rules[r]['reason'].format(**values))
+        return directional + followers
+
+class RuleEngine:
+    def __init__(self, config):
+        signals_config = config['signals']
+        parameters = {name: value for name, value in signals_config['indicators'].items()
+                      if isinstance(value, (int, float)) and not isinstance(value, bool)}
+
+        fields = available_fields(config)
+        self.default = Strategy('default', signals_config, parameters, fields)
+        self.strategies: Dict[str, Strategy] = {'default': self.default}
+        for name, strategy_config in (signals_config.get('strategies') or {}).items():
+            self.strategies[name] = Strategy(name, strategy_config, parameters, fields)
+
+        for period in config.get('trading_hours', {}).get('periods') or []:
+            strategy = period.get('strategy')
+            if strategy is not None and strategy not in self.strategies:
+                raise ValueError(f"Trading period '{period.get('name')}' uses unknown strategy '{strategy}'")
+
+        logger.info(f"Signal rules compiled: {', '.join(f'{name} ({sum(len(rules) for rules in strategy.groups)} rules)' for name, strategy in self.strategies.items())}")
+
+    def custom_strategies(self) -> List[str]:
+        return [name for name, strategy in self.strategies.items() if not strategy.uses_default_rules]
+
+    def get(self, name: Optional[str] = None) -> Strategy:
+        return self.strategies.get(name or 'default', self.default)
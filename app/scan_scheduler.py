@@ -0,0 +1,166 @@
+import math
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('skip', 'coalesce', 'shrink')
+
+class ScanScheduler:
+    # scan_fn returns False for idle ticks (outside trading hours, no data); durations, lateness and
+    # overruns are averaged over the cycles that actually scanned.
+    def __init__(self, scan_fn: Callable[[float], Optional[bool]], interval_seconds: float, policy: str = 'skip',
+                 budget_seconds: Optional[float] = None, min_universe_fraction: float = 0.25,
+                 stats_log_cycles: int = 60):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scan overrun policy '{policy}' (expected one of {', '.join(POLICIES)})")
+
+        self.scan_fn = scan_fn
+        self.interval = interval_seconds
+        self.policy = policy
+        self.budget = budget_seconds if budget_seconds is not None else interval_seconds
+        self.min_universe_fraction = min_universe_fraction
+        self.stats_log_cycles = stats_log_cycles
+        self.universe_fraction = 1.0
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                'cycles': 0,
+                'scans': 0,
+                'idle_cycles': 0,
+                'overruns': 0,
+                'skipped_boundaries': 0,
+                'coalesced_runs': 0,
+                'errors': 0,
+                'total_duration': 0.0,
+                'max_duration': 0.0,
+                'last_duration': 0.0,
+                'total_lateness': 0.0,
+                'max_lateness': 0.0,
+                'last_lateness': 0.0
+            }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        scans = stats['scans']
+        stats['avg_duration'] = stats['total_duration'] / scans if scans else 0.0
+        stats['avg_lateness'] = stats['total_lateness'] / scans if scans else 0.0
+        stats['overrun_rate'] = stats['overruns'] / scans if scans else 0.0
+        stats['universe_fraction'] = self.universe_fraction
+        stats['policy'] = self.policy
+        stats['budget_seconds'] = self.budget
+        return stats
+
+    def next_boundary(self, now: float) -> float:
+        return math.floor(now / self.interval) * self.interval + self.interval
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='scan-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Scan scheduler started: every {self.interval}s on wall-clock boundaries, "
+                    f"budget {self.budget}s, overrun policy '{self.policy}'")
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        scheduled = self.next_boundary(time.time())
+        while not self._stop.is_set():
+            delay = scheduled - time.time()
+            if delay > 0 and self._stop.wait(delay):
+                break
+
+            started = time.time()
+            lateness = max(0.0, started - scheduled)
+            self._run_cycle(lateness)
+            scheduled = self._schedule_after(scheduled, time.time())
+
+    def _run_cycle(self, lateness: float):
+        started = time.perf_counter()
+        failed = False
+        scanned = True
+        try:
+            scanned = self.scan_fn(self.universe_fraction) is not False
+        except Exception as e:
+            failed = True
+            logger.error(f"Scan cycle raised: {e}", exc_info=True)
+        duration = time.perf_counter() - started
+        overrun = scanned and duration > self.budget
+
+        with self._lock:
+            stats = self._stats
+            stats['cycles'] += 1
+            stats['errors'] += int(failed)
+            cycles = stats['cycles']
+            if scanned:
+                stats['scans'] += 1
+                stats['overruns'] += int(overrun)
+                stats['last_duration'] = duration
+                stats['total_duration'] += duration
+                stats['max_duration'] = max(stats['max_duration'], duration)
+                stats['last_lateness'] = lateness
+                stats['total_lateness'] += lateness
+                stats['max_lateness'] = max(stats['max_lateness'], lateness)
+            else:
+                stats['idle_cycles'] += 1
+
+        if overrun:
+            logger.warning(f"Scan cycle overran budget: {duration:.2f}s > {self.budget:.2f}s "
+                           f"(started {lateness:.2f}s late, policy '{self.policy}')")
+
+        if self.policy == 'shrink' and scanned:
+            self._adapt_universe(duration)
+
+        if self.stats_log_cycles and cycles % self.stats_log_cycles == 0:
+            self.log_stats()
+
+    def _adapt_universe(self, duration: float):
+        previous = self.universe_fraction
+        if duration > self.budget:
+            target = previous * (self.budget / duration) * 0.9
+            self.universe_fraction = max(self.min_universe_fraction, target)
+        elif duration < self.budget * 0.5 and previous < 1.0:
+            self.universe_fraction = min(1.0, previous * 1.25)
+
+        if self.universe_fraction != previous:
+            logger.info(f"Scan universe fraction adjusted: {previous:.0%} → {self.universe_fraction:.0%}")
+
+    def _schedule_after(self, scheduled: float, now: float) -> float:
+        following = scheduled + self.interval
+        if now <= following:
+            return following
+
+        missed = math.floor((now - following) / self.interval) + 1
+        if self.policy == 'coalesce':
+            with self._lock:
+                self._stats['coalesced_runs'] += 1
+                self._stats['skipped_boundaries'] += missed - 1
+            return following + (missed - 1) * self.interval
+
+        with self._lock:
+            self._stats['skipped_boundaries'] += missed
+        return following + missed * self.interval
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(
+            f"Scan scheduler: {stats['cycles']} cycles ({stats['scans']} scans, {stats['idle_cycles']} idle), "
+            f"{stats['overruns']} overruns ({stats['overrun_rate']:.1%}), {stats['skipped_boundaries']} skipped, "
+            f"{stats['coalesced_runs']} coalesced | duration avg {stats['avg_duration']:.2f}s max {stats['max_duration']:.2f}s | "
+            f"lateness avg {stats['avg_lateness']:.3f}s max {stats['max_lateness']:.3f}s | "
+            f"universe {stats['universe_fraction']:.0%}"
+        )
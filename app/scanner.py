@@ -1,41 +1,83 @@
 import requests
 import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from pathlib import Path
+from app.price_store import PriceStore
+from app.http_client import create_session, get_timeouts
+from app.ticker_parser import TickerParser, TickerSnapshot, JSON_DECODER, json_loads
+from app.universe import CoinUniverse
 
 logger = logging.getLogger(__name__)
 
 class PriceScanner:
     def __init__(self, config):
         self.config = config
-        self.api_endpoint = "https://api.coindcx.com/exchange/ticker"
-        self.timeout = config['performance']['api_timeout_seconds']
+        self.api_endpoint = config['scanner'].get('api_endpoint', "https://api.coindcx.com/exchange/ticker")
+        self.timeout = get_timeouts(config)
+        self.session = create_session(pool_size=2)
+        self.last_fetch_stats = {}
         self.max_retries = config['performance']['max_api_retries']
         self.cache_duration = config['performance']['cache_price_data_seconds']
         
         self.price_cache = {}
         self.cache_timestamp = None
-        self.price_history = defaultdict(lambda: deque(maxlen=100))
-        self.volume_history = defaultdict(lambda: deque(maxlen=20))
+        self.history_size = 100
+        self.volume_window = 20
+        self.store = PriceStore(capacity=self.history_size)
+        self.tick_listeners = []
+        self._parser = None
+        self._parser_version = None
         
-    def fetch_all_tickers(self) -> Optional[Dict]:
+        checkpoint_config = config['scanner'].get('history_checkpoint', {})
+        self.checkpoint_enabled = checkpoint_config.get('enabled', False)
+        self.checkpoint_file = checkpoint_config.get('file', 'data/price_history.npz')
+        self.checkpoint_max_age = checkpoint_config.get('max_age_minutes', 5)
+        self.checkpoint_interval = checkpoint_config.get('interval_seconds', 60)
+        self._last_checkpoint = time.monotonic()
+        self._checkpoint_lock = threading.Lock()
+        self._checkpoint_writer = None
+        self._pending_checkpoint = None
+        if self.checkpoint_enabled:
+            self._checkpoint_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-checkpoint")
+            self.load_history_checkpoint()
+        
+    def add_tick_listener(self, listener):
+        self.tick_listeners.append(listener)
+    
+    def _notify_tick(self, rows: np.ndarray):
+        for listener in self.tick_listeners:
+            listener(rows)
+    
+    def _fetch_raw(self) -> Optional[bytes]:
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"Fetching tickers from CoinDCX API (attempt {attempt + 1}/{self.max_retries})...")
-                response = requests.get(self.api_endpoint, timeout=self.timeout)
+                start = time.perf_counter()
+                response = self.session.get(self.api_endpoint, timeout=self.timeout, stream=True)
+                ttfb = time.perf_counter() - start
                 response.raise_for_status()
-                data = response.json()
-                
-                ticker_dict = {}
-                for ticker in data:
-                    if isinstance(ticker, dict):
-                        market = ticker.get('market', '')
-                        ticker_dict[market] = ticker
                 
-                logger.debug(f"Successfully fetched {len(ticker_dict)} market tickers")
-                return ticker_dict
+                body = response.content
+                download = time.perf_counter() - start - ttfb
+                self.last_fetch_stats = {
+                    'ttfb_ms': ttfb * 1000,
+                    'download_ms': download * 1000,
+                    'wire_bytes': response.raw.tell(),
+                    'body_bytes': len(body),
+                    'encoding': response.headers.get('Content-Encoding', 'identity')
+                }
+                logger.debug(
+                    f"Ticker fetch: TTFB {self.last_fetch_stats['ttfb_ms']:.0f}ms, "
+                    f"download {self.last_fetch_stats['download_ms']:.0f}ms, "
+                    f"{self.last_fetch_stats['wire_bytes'] / 1024:.0f}KB {self.last_fetch_stats['encoding']} "
+                    f"({len(body) / 1024:.0f}KB decoded)"
+                )
+                return body
                 
             except requests.exceptions.RequestException as e:
                 logger.warning(f"API request failed (attempt {attempt + 1}/{self.max_retries}): {e}")
@@ -47,6 +89,55 @@ class PriceScanner:
         
         return None
     
+    def fetch_all_tickers(self) -> Optional[Dict]:
+        body = self._fetch_raw()
+        if body is None:
+            return None
+        
+        try:
+            data = json_loads(body)
+        except ValueError as e:
+            logger.error(f"Invalid ticker response: {e}")
+            return None
+        
+        ticker_dict = {}
+        for ticker in data:
+            if isinstance(ticker, dict):
+                market = ticker.get('market', '')
+                ticker_dict[market] = ticker
+        
+        logger.debug(f"Successfully fetched {len(ticker_dict)} market tickers")
+        return ticker_dict
+    
+    def _get_parser(self, universe: CoinUniverse) -> TickerParser:
+        if self._parser is None or self._parser_version != (id(universe), universe.version):
+            self._parser = TickerParser(
+                universe.coins,
+                rows=self.store.rows_for(universe.coins),
+                markets=universe.markets,
+                market_index=universe.market_index
+            )
+            self._parser_version = (id(universe), universe.version)
+            logger.debug(f"Ticker parser built for {len(universe)} coins ({JSON_DECODER} decoder)")
+        return self._parser
+    
+    def fetch_snapshot(self, universe: CoinUniverse) -> Optional[TickerSnapshot]:
+        parser = self._get_parser(universe)
+        body = self._fetch_raw()
+        if body is None:
+            return None
+        
+        start = time.perf_counter()
+        try:
+            snapshot = parser.parse(body)
+        except ValueError as e:
+            logger.error(f"Invalid ticker response: {e}")
+            return None
+        self.last_fetch_stats['parse_ms'] = (time.perf_counter() - start) * 1000
+        
+        self._append_snapshot(snapshot)
+        return snapshot
+    
     def get_coin_price_data(self, coin_symbol: str) -> Optional[Dict]:
         market_symbol = f"{coin_symbol}INR"
         
@@ -78,11 +169,14 @@ class PriceScanner:
             }
             
             if price_data['price'] > 0:
-                self.price_history[coin_symbol].append({
-                    'price': price_data['price'],
-                    'timestamp': price_data['timestamp']
-                })
-                self.volume_history[coin_symbol].append(price_data['volume'])
+                row = self.store.row_for(coin_symbol)
+                self.store.append(
+                    row,
+                    price_data['price'],
+                    price_data['volume'],
+                    int(price_data['timestamp'].timestamp() * 1000)
+                )
+                self._notify_tick(np.array([row], dtype=np.int64))
                 
             return price_data
             
@@ -91,64 +185,115 @@ class PriceScanner:
             return None
     
     def get_bulk_price_data(self, coin_symbols: List[str]) -> Dict[str, Dict]:
-        all_tickers = self.fetch_all_tickers()
-        if not all_tickers:
+        parser = TickerParser(coin_symbols, rows=self.store.rows_for(coin_symbols))
+        body = self._fetch_raw()
+        if body is None:
             return {}
         
-        self.price_cache = all_tickers
-        self.cache_timestamp = datetime.now()
+        try:
+            snapshot = parser.parse(body)
+        except ValueError as e:
+            logger.error(f"Invalid ticker response: {e}")
+            return {}
         
-        results = {}
-        for coin_symbol in coin_symbols:
-            market_symbol = f"{coin_symbol}INR"
-            ticker = all_tickers.get(market_symbol)
-            
-            if ticker:
-                try:
-                    price_data = {
-                        'symbol': coin_symbol,
-                        'market': market_symbol,
-                        'price': float(ticker.get('last_price', 0)),
-                        'volume': float(ticker.get('volume', 0)),
-                        'high': float(ticker.get('high', 0)),
-                        'low': float(ticker.get('low', 0)),
-                        'change_24h': float(ticker.get('change_24_hour', 0)),
-                        'timestamp': datetime.now()
-                    }
-                    
-                    if price_data['price'] > 0:
-                        self.price_history[coin_symbol].append({
-                            'price': price_data['price'],
-                            'timestamp': price_data['timestamp']
-                        })
-                        self.volume_history[coin_symbol].append(price_data['volume'])
-                        results[coin_symbol] = price_data
-                        
-                except (ValueError, TypeError) as e:
-                    logger.error(f"Error parsing ticker for {coin_symbol}: {e}")
-                    continue
-        
-        return results
-    
-    def get_price_history(self, coin_symbol: str, periods: int = 20) -> List[float]:
-        history = self.price_history.get(coin_symbol, deque())
-        return [item['price'] for item in list(history)[-periods:]]
-    
-    def get_volume_history(self, coin_symbol: str) -> List[float]:
-        return list(self.volume_history.get(coin_symbol, deque()))
+        self._append_snapshot(snapshot)
+        return snapshot.to_price_data()
+    
+    def _append_snapshot(self, snapshot: TickerSnapshot):
+        rows = snapshot.rows[snapshot.valid]
+        self.store.append_many(rows, snapshot.price[snapshot.valid], snapshot.volume[snapshot.valid], snapshot.timestamp_ms)
+        self._notify_tick(rows)
+    
+    def checkpoint_if_due(self) -> bool:
+        # Runs on the scan thread between appends: the buffers are copied here and only the
+        # file write happens in the background, so the checkpoint never sees a half-written tick.
+        if not self.checkpoint_enabled or self.store.size == 0:
+            return False
+        if time.monotonic() - self._last_checkpoint < self.checkpoint_interval:
+            return False
+        
+        self._last_checkpoint = time.monotonic()
+        self._pending_checkpoint = self._checkpoint_writer.submit(self._write_checkpoint, self.store.snapshot())
+        return True
+    
+    def save_history_checkpoint(self) -> bool:
+        # Synchronous save; only call it while no scan is running (e.g. on shutdown).
+        if not self.checkpoint_enabled or self.store.size == 0:
+            return False
+        
+        if self._pending_checkpoint is not None:
+            self._pending_checkpoint.result()
+        return self._write_checkpoint(self.store.snapshot())
+    
+    def _write_checkpoint(self, snapshot: Dict[str, np.ndarray]) -> bool:
+        with self._checkpoint_lock:
+            try:
+                start = time.perf_counter()
+                self.store.save(self.checkpoint_file, snapshot)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                logger.debug(f"Price history checkpoint saved ({len(snapshot['symbols'])} coins, {elapsed_ms:.1f}ms)")
+                return True
+            except OSError as e:
+                logger.warning(f"Failed to save price history checkpoint: {e}")
+                return False
+    
+    def load_history_checkpoint(self) -> int:
+        if not Path(self.checkpoint_file).exists():
+            logger.info("No price history checkpoint found, starting cold")
+            return 0
+        
+        cutoff_time = datetime.now() - timedelta(minutes=self.checkpoint_max_age)
+        try:
+            samples = self.store.load(self.checkpoint_file, int(cutoff_time.timestamp() * 1000))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load price history checkpoint {self.checkpoint_file}: {e}")
+            return 0
+        
+        ready = int((self.store.counts[:self.store.size] >= 20).sum())
+        logger.info(f"Warm start: restored {samples} samples (<= {self.checkpoint_max_age} min old), {ready} coins ready for analysis")
+        return samples
+    
+    def get_price_history(self, coin_symbol: str, periods: int = 20) -> np.ndarray:
+        row = self.store.get_row(coin_symbol)
+        if row is None:
+            return np.empty(0, dtype=np.float64)
+        return self.store.price_window(row, periods)
+    
+    def get_volume_history(self, coin_symbol: str) -> np.ndarray:
+        row = self.store.get_row(coin_symbol)
+        if row is None:
+            return np.empty(0, dtype=np.float64)
+        return self.store.volume_window(row, self.volume_window)
+    
+    def get_ready_rows(self, coin_symbols: List[str], min_periods: int = 20) -> tuple[List[str], np.ndarray]:
+        rows = self.store.rows_for(coin_symbols)
+        ready = self.store.counts[rows] >= min_periods
+        ready_symbols = [symbol for symbol, is_ready in zip(coin_symbols, ready) if is_ready]
+        return ready_symbols, rows[ready]
+    
+    def ready_mask(self, snapshot: TickerSnapshot, min_periods: int = 20) -> np.ndarray:
+        return snapshot.valid & (self.store.counts[snapshot.rows] >= min_periods)
+    
+    def get_history_matrices(self, rows: np.ndarray, periods: int = 20) -> tuple[np.ndarray, np.ndarray]:
+        price_matrix = self.store.window_matrix(rows, periods, 'prices')
+        volume_matrix = self.store.window_matrix(rows, min(periods, self.volume_window), 'volumes')
+        return price_matrix, volume_matrix
+    
+    def get_history_matrix(self, coin_symbols: List[str], periods: int = 20) -> tuple[List[str], np.ndarray, np.ndarray]:
+        ready_symbols, ready_rows = self.get_ready_rows(coin_symbols, periods)
+        price_matrix, volume_matrix = self.get_history_matrices(ready_rows, periods)
+        return ready_symbols, price_matrix, volume_matrix
+    
+    def get_history_length(self, coin_symbol: str) -> int:
+        return self.store.count(self.store.get_row(coin_symbol))
     
     def get_average_volume(self, coin_symbol: str) -> float:
         volumes = self.get_volume_history(coin_symbol)
-        return sum(volumes) / len(volumes) if volumes else 0
+        return float(volumes.mean()) if len(volumes) else 0
     
     def has_sufficient_history(self, coin_symbol: str, min_periods: int = 20) -> bool:
-        return len(self.price_history.get(coin_symbol, deque())) >= min_periods
+        return self.get_history_length(coin_symbol) >= min_periods
     
     def clear_old_history(self, hours: int = 24):
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        for coin_symbol in list(self.price_history.keys()):
-            history = self.price_history[coin_symbol]
-            while history and history[0]['timestamp'] < cutoff_time:
-                history.popleft()
-
+        self.store.drop_older_than(int(cutoff_time.timestamp() * 1000))
@@ -0,0 +1,202 @@
+import numpy as np
+import logging
+from typing import Optional
+from app.indicators import TechnicalIndicators
+from app.indicator_core import macd_weights
+from app.indicator_registry import IndicatorContext
+from app.price_store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+STATE_FIELDS = ('gain_sum', 'loss_sum', 'bb_shift', 'bb_sum', 'bb_sumsq')
+
+class StreamingIndicators(TechnicalIndicators):
+    # Keeps RSI gain/loss sums and Bollinger running sums per store row and advances them in
+    # O(1) per tick. MACD is evaluated at scan time as fixed weights over the same window batch
+    # mode uses (EMAs seeded at its first sample), so crossovers match batch mode.
+    def __init__(self, config, store: PriceStore, volume_window: int = 20):
+        super().__init__(config)
+        self.store = store
+        self.volume_window = volume_window
+        self.resync_every = self.config.get('streaming_resync_ticks', 500)
+        self.ticks_since_resync = 0
+        self._allocate(store.prices.shape[0])
+        if store.size:
+            self.rebuild()
+
+    def _allocate(self, rows: int):
+        self.samples = np.zeros(rows, dtype=np.int64)
+        for name in STATE_FIELDS:
+            setattr(self, name, np.zeros(rows))
+
+    def _ensure_rows(self):
+        rows = self.store.prices.shape[0]
+        current = len(self.samples)
+        if rows <= current:
+            return
+        for name in ('samples',) + STATE_FIELDS:
+            values = getattr(self, name)
+            grown = np.zeros(rows, dtype=values.dtype)
+            grown[:current] = values
+            setattr(self, name, grown)
+
+    def _price_at(self, rows: np.ndarray, back) -> np.ndarray:
+        return self.store.prices[rows, self.store.heads[rows] + self.store.capacity - back]
+
+    def update(self, rows: np.ndarray):
+        self._ensure_rows()
+        self._advance(rows, 0)
+
+        self.ticks_since_resync += 1
+        if self.ticks_since_resync >= self.resync_every:
+            self.resync()
+
+    def _advance(self, rows: np.ndarray, back: int):
+        if len(rows) == 0:
+            return
+
+        rsi_period = self.config['rsi_period']
+        bb_period = self.config['bb_period']
+
+        price = self._price_at(rows, back)
+        samples = self.samples[rows] + 1
+        self.samples[rows] = samples
+        first = samples == 1
+
+        has_delta = samples > 1
+        delta = np.where(has_delta, price - self._price_at(rows, back + 1), 0.0)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+
+        drops_delta = samples > rsi_period + 1
+        drop_rows = rows[drops_delta]
+        dropped = (self._price_at(drop_rows, back + rsi_period) -
+                   self._price_at(drop_rows, back + rsi_period + 1))
+        gain[drops_delta] -= np.where(dropped > 0, dropped, 0.0)
+        loss[drops_delta] -= np.where(dropped < 0, -dropped, 0.0)
+        self.gain_sum[rows] += gain
+        self.loss_sum[rows] += loss
+
+        self.bb_shift[rows] = np.where(first, price, self.bb_shift[rows])
+        shifted = price - self.bb_shift[rows]
+        sum_delta = shifted.copy()
+        sumsq_delta = shifted * shifted
+
+        drops_price = samples > bb_period
+        drop_rows = rows[drops_price]
+        dropped = self._price_at(drop_rows, back + bb_period) - self.bb_shift[drop_rows]
+        sum_delta[drops_price] -= dropped
+        sumsq_delta[drops_price] -= dropped * dropped
+        self.bb_sum[rows] = np.where(first, 0.0, self.bb_sum[rows]) + sum_delta
+        self.bb_sumsq[rows] = np.where(first, 0.0, self.bb_sumsq[rows]) + sumsq_delta
+
+    def resync(self):
+        self.ticks_since_resync = 0
+        rows = np.flatnonzero(self.samples[:self.store.size] > 0)
+        if len(rows) == 0:
+            return
+
+        rsi_period = self.config['rsi_period']
+        bb_period = self.config['bb_period']
+        counts = self.store.counts[rows]
+
+        rsi_rows = rows[counts > rsi_period]
+        if len(rsi_rows):
+            deltas = np.diff(self.store.window_matrix(rsi_rows, rsi_period + 1), axis=1)
+            self.gain_sum[rsi_rows] = np.where(deltas > 0, deltas, 0).sum(axis=1)
+            self.loss_sum[rsi_rows] = np.where(deltas < 0, -deltas, 0).sum(axis=1)
+
+        bb_rows = rows[counts >= bb_period]
+        if len(bb_rows):
+            shifted = self.store.window_matrix(bb_rows, bb_period) - self.bb_shift[bb_rows, None]
+            self.bb_sum[bb_rows] = shifted.sum(axis=1)
+            self.bb_sumsq[bb_rows] = (shifted * shifted).sum(axis=1)
+
+    def rebuild(self):
+        self._allocate(self.store.prices.shape[0])
+        self.ticks_since_resync = 0
+
+        active = np.arange(self.store.size)
+        counts = self.store.counts[:self.store.size]
+        for back in range(int(counts.max(initial=0)) - 1, -1, -1):
+            self._advance(active[counts > back], back)
+
+        logger.info(f"Streaming indicator state rebuilt for {int((counts > 0).sum())} coins")
+
+    def screen_state(self, rows: np.ndarray):
+        # RSI gain/loss sums (losses below float noise snap to zero, as in analyze_rows) and the
+        # Bollinger mean and standard deviation from the running sums.
+        rsi_period = self.config['rsi_period']
+        gains = np.maximum(self.gain_sum[rows], 0.0)
+        losses = np.maximum(self.loss_sum[rows], 0.0)
+        losses = np.where(losses <= 1e-12 * rsi_period * np.abs(self.bb_shift[rows]), 0.0, losses)
+        sma, std = self._bollinger_state(rows)
+        return gains, losses, sma, std
+
+    def _bollinger_state(self, rows: np.ndarray):
+        bb_period = self.config['bb_period']
+        mean_shifted = self.bb_sum[rows] / bb_period
+        std = np.sqrt(np.maximum(self.bb_sumsq[rows] / bb_period - mean_shifted * mean_shifted, 0.0))
+        return self.bb_shift[rows] + mean_shifted, std
+
+    def analyze_rows(self, rows: np.ndarray, current_volumes: Optional[np.ndarray] = None) -> np.ndarray:
+        rsi_period = self.config['rsi_period']
+        bb_period = self.config['bb_period']
+        std_dev = self.config['bb_std']
+        fast = self.config['macd_fast']
+        slow = self.config['macd_slow']
+        signal = self.config['macd_signal']
+
+        results = self.engine.empty_results(len(rows))
+        samples = self.samples[rows]
+
+        avg_gain = self.gain_sum[rows] / rsi_period
+        avg_loss = np.maximum(self.loss_sum[rows] / rsi_period, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss <= 1e-12 * np.abs(self.bb_shift[rows]), 100.0,
+                           100 - (100 / (1 + np.maximum(avg_gain, 0.0) / avg_loss)))
+        results['rsi'] = np.where(samples >= rsi_period + 1, rsi, np.nan)
+
+        history = int(self.store.counts[rows].min()) if len(rows) else 0
+        window = min(history, self.volume_window)
+        if window >= slow + signal:
+            prices = self.store.window_matrix(rows, window)
+            macd = (prices - prices[:, :1]) @ macd_weights(window, fast, slow, signal)
+            histogram = macd[:, 2]
+            previous = macd[:, 3]
+            results['macd'] = macd[:, 0]
+            results['macd_signal'] = macd[:, 1]
+            results['macd_histogram'] = histogram
+            results['bullish_crossover'] = (histogram > 0) & (previous < 0)
+            results['bearish_crossover'] = (histogram < 0) & (previous > 0)
+
+        has_bb = samples >= bb_period
+        sma, std = self._bollinger_state(rows)
+        upper_band = sma + (std_dev * std)
+        lower_band = sma - (std_dev * std)
+        current_price = self._price_at(rows, 0)
+        width = upper_band - lower_band
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bb_position = np.where(width != 0, (current_price - lower_band) / width, 0.5)
+            bandwidth = width / sma * 100
+        results['bb_upper'] = np.where(has_bb, upper_band, np.nan)
+        results['bb_middle'] = np.where(has_bb, sma, np.nan)
+        results['bb_lower'] = np.where(has_bb, lower_band, np.nan)
+        results['bb_current'] = np.where(has_bb, current_price, np.nan)
+        results['bb_position'] = np.where(has_bb, bb_position, np.nan)
+        results['bb_at_lower'] = has_bb & (bb_position < 0.2)
+        results['bb_at_upper'] = has_bb & (bb_position > 0.8)
+        results['bb_bandwidth'] = np.where(has_bb, bandwidth, np.nan)
+
+        volume_matrix = self.store.window_matrix(rows, window, 'volumes')
+        if current_volumes is None:
+            current_volumes = self.store.latest(rows, 'volumes')
+        current_volumes = np.asarray(current_volumes, dtype=np.float64)
+        momentum_prices = self.store.window_matrix(rows, min(history, 5))
+        self.engine.compute(['volume', 'momentum'], IndicatorContext(self.engine.registry, momentum_prices, volume_matrix, current_volumes), results)
+        if self.engine.plugins:
+            plugin_prices = self.store.window_matrix(rows, window)
+            self.engine.compute(self.engine.plugins, IndicatorContext(self.engine.registry, plugin_prices, volume_matrix, current_volumes), results)
+
+        results['has_data'] = ~(np.isnan(results['rsi']) | np.isnan(results['macd']) | np.isnan(results['bb_middle']))
+        return results
@@ -0,0 +1,109 @@
+import json
+import logging
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_DECODER = 'orjson'
+except ImportError:
+    json_loads = json.loads
+    JSON_DECODER = 'json'
+
+logger = logging.getLogger(__name__)
+
+TICKER_FIELDS = ('last_price', 'volume', 'high', 'low', 'change_24_hour')
+
+class TickerSnapshot:
+    def __init__(self, coins: List[str], markets: List[str], rows: np.ndarray, values: np.ndarray,
+                 valid: np.ndarray, timestamp: datetime):
+        self.coins = coins
+        self.markets = markets
+        self.rows = rows
+        self.price = values[0]
+        self.volume = values[1]
+        self.high = values[2]
+        self.low = values[3]
+        self.change_24h = values[4]
+        self.valid = valid
+        self.timestamp = timestamp
+        self.timestamp_ms = int(timestamp.timestamp() * 1000)
+
+    @property
+    def count(self) -> int:
+        return int(np.count_nonzero(self.valid))
+
+    def price_data(self, index: int) -> Dict:
+        return {
+            'symbol': self.coins[index],
+            'market': self.markets[index],
+            'price': float(self.price[index]),
+            'volume': float(self.volume[index]),
+            'high': float(self.high[index]),
+            'low': float(self.low[index]),
+            'change_24h': float(self.change_24h[index]),
+            'timestamp': self.timestamp
+        }
+
+    def to_price_data(self) -> Dict[str, Dict]:
+        return {self.coins[index]: self.price_data(index) for index in np.flatnonzero(self.valid)}
+
+class TickerParser:
+    # Output arrays are reused on every parse; a snapshot is valid until the next one.
+    def __init__(self, coins: Sequence[str], rows: Optional[np.ndarray] = None, quote: str = 'INR',
+                 markets: Optional[List[str]] = None, market_index: Optional[Dict[str, int]] = None):
+        self.coins = list(coins)
+        self.markets = markets if markets is not None else [f"{coin}{quote}" for coin in self.coins]
+        self.market_index = market_index if market_index is not None else {
+            market: index for index, market in enumerate(self.markets)
+        }
+        self.rows = rows if rows is not None else np.arange(len(self.coins), dtype=np.int64)
+        self.values = np.zeros((len(TICKER_FIELDS), len(self.coins)), dtype=np.float64)
+        self.valid = np.zeros(len(self.coins), dtype=bool)
+
+    def parse(self, raw: bytes) -> TickerSnapshot:
+        return self.parse_tickers(json_loads(raw))
+
+    def parse_tickers(self, tickers: List[Dict]) -> TickerSnapshot:
+        lookup = self.market_index.get
+        indices = []
+        fields = []
+
+        for ticker in tickers:
+            if not isinstance(ticker, dict):
+                continue
+            index = lookup(ticker.get('market'))
+            if index is None:
+                continue
+            indices.append(index)
+            fields.append((
+                ticker.get('last_price', 0),
+                ticker.get('volume', 0),
+                ticker.get('high', 0),
+                ticker.get('low', 0),
+                ticker.get('change_24_hour', 0)
+            ))
+
+        self.valid[:] = False
+        if indices:
+            indices = np.array(indices, dtype=np.int64)
+            try:
+                parsed = np.array(fields, dtype=np.float64)
+            except (ValueError, TypeError):
+                parsed = self._parse_rows(indices, fields)
+
+            self.values[:, indices] = parsed.T
+            self.valid[indices] = np.isfinite(parsed).all(axis=1) & (parsed[:, 0] > 0)
+
+        return TickerSnapshot(self.coins, self.markets, self.rows, self.values, self.valid, datetime.now())
+
+    def _parse_rows(self, indices: np.ndarray, fields: List[tuple]) -> np.ndarray:
+        parsed = np.full((len(fields), len(TICKER_FIELDS)), np.nan)
+        for position, row in enumerate(fields):
+            try:
+                parsed[position] = [float(value) for value in row]
+            except (ValueError, TypeError) as e:
+                logger.error(f"Error parsing ticker for {self.coins[indices[position]]}: {e}")
+        return parsed
@@ -0,0 +1,49 @@
+import os
+import logging
+from typing import Dict, List
+from app.utils import load_futures_coins
+
+logger = logging.getLogger(__name__)
+
+class CoinUniverse:
+    def __init__(self, coins_file: str, quote: str = 'INR'):
+        self.coins_file = coins_file
+        self.quote = quote
+        self.coins: List[str] = []
+        self.markets: List[str] = []
+        self.coin_index: Dict[str, int] = {}
+        self.market_index: Dict[str, int] = {}
+        self.version = 0
+        self._mtime = None
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.coins)
+
+    def refresh(self) -> bool:
+        try:
+            mtime = os.stat(self.coins_file).st_mtime_ns
+        except FileNotFoundError:
+            if self.version == 0:
+                raise FileNotFoundError(f"Coins file not found: {self.coins_file}")
+            logger.warning(f"Coins file {self.coins_file} disappeared, keeping {len(self.coins)} loaded coins")
+            return False
+
+        if mtime == self._mtime:
+            return False
+
+        coins = list(dict.fromkeys(load_futures_coins(self.coins_file)))
+        previous = set(self.coins)
+
+        self.coins = coins
+        self.markets = [f"{coin}{self.quote}" for coin in coins]
+        self.coin_index = {coin: index for index, coin in enumerate(coins)}
+        self.market_index = {market: index for index, market in enumerate(self.markets)}
+        self._mtime = mtime
+        self.version += 1
+
+        if self.version > 1:
+            added = len(set(coins) - previous)
+            removed = len(previous - set(coins))
+            logger.info(f"Coin universe reloaded: {len(coins)} coins (+{added}/-{removed})")
+        return True
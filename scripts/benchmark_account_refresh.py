@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'scripts'))
+
+from app.account_manager import AccountManager
+from app.utils import load_config
+from mock_server import build_server
+
+API_KEY = 'mock-key'
+API_SECRET = 'mock-secret'
+
+def legacy_request(endpoint, url, timeout):
+    secret_bytes = bytes(API_SECRET, encoding='utf-8')
+    payload_json = json.dumps({'timestamp': int(time.time() * 1000)}, separators=(',', ':'))
+    signature = hmac.new(secret_bytes, payload_json.encode(), hashlib.sha256).hexdigest()
+    headers = {'Content-Type': 'application/json', 'X-AUTH-APIKEY': API_KEY, 'X-AUTH-SIGNATURE': signature}
+    response = requests.post(f"{url}{endpoint}", data=payload_json, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+def legacy_refresh(url):
+    legacy_request('/exchange/v1/users/balances', url, 10)
+    legacy_request('/exchange/v1/orders/active_orders', url, 10)
+
+def best_of(fn, repeats=10):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+def main():
+    latency_ms = int(os.environ.get('LATENCY_MS', 80))
+    server = build_server(port=0, extra_markets=0, latency_ms=latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    config = load_config()
+    config['personalized']['api_endpoint'] = url
+    manager = AccountManager(config, API_KEY, API_SECRET)
+    manager.refresh_account_data()
+    assert manager.account_balance['total_balance'] > 0, "signed request rejected by stand-in server"
+    assert manager.open_positions, "active orders not parsed"
+
+    print(f"Stand-in server latency: {latency_ms} ms per endpoint")
+    print(f"{'path':>22} {'best (ms)':>10} {'mean (ms)':>10}")
+    for name, fn in (('sequential (legacy)', lambda: legacy_refresh(url)),
+                     ('parallel + session', manager.refresh_account_data)):
+        best, mean = best_of(fn)
+        print(f"{name:>22} {best * 1000:>10.1f} {mean * 1000:>10.1f}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
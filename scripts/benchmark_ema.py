@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from app import indicators
+from app.indicators import ema_filter
+
+def legacy_ema(prices, period):
+    multiplier = 2 / (period + 1)
+    ema = np.zeros(len(prices))
+    ema[0] = prices[0]
+
+    for i in range(1, len(prices)):
+        ema[i] = (prices[i] * multiplier) + (ema[i-1] * (1 - multiplier))
+
+    return ema
+
+def legacy_macd(matrix):
+    for row in matrix:
+        macd_line = legacy_ema(row, 5) - legacy_ema(row, 13)
+        legacy_ema(macd_line, 5)
+
+def kernel_macd(matrix):
+    macd_line = ema_filter(matrix, 5) - ema_filter(matrix, 13)
+    ema_filter(macd_line, 5)
+
+def best_of(fn, matrix, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(matrix)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    rng = np.random.default_rng(42)
+    long_backend = "scipy.signal.lfilter" if indicators.lfilter is not None else "numpy loop"
+    print(f"EMA kernel backend: numpy weight matrix up to {indicators.EMA_MATRIX_MAX_PERIODS} periods, {long_backend} beyond")
+    print(f"{'coins':>6} {'periods':>8} {'legacy (ms)':>12} {'kernel (ms)':>12} {'speedup':>9}")
+
+    for coins, periods in [(377, 20), (377, 100), (2600, 20), (2600, 100), (377, 1000)]:
+        matrix = 100 * np.cumprod(1 + rng.normal(0, 0.002, (coins, periods)), axis=1)
+
+        expected = np.array([legacy_ema(row, 13) for row in matrix])
+        assert np.allclose(ema_filter(matrix, 13), expected, rtol=1e-10), "kernel does not match legacy EMA"
+
+        legacy = best_of(legacy_macd, matrix, 3)
+        kernel = best_of(kernel_macd, matrix, 20)
+        print(f"{coins:>6} {periods:>8} {legacy * 1000:>12.2f} {kernel * 1000:>12.3f} {legacy / kernel:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.ticker_parser import TickerParser, JSON_DECODER
+from app.utils import load_futures_coins
+
+def build_snapshot(coins, extra_markets):
+    tickers = []
+    for coin in coins:
+        price = random.uniform(0.01, 50000)
+        tickers.append({
+            'market': f"{coin}INR",
+            'change_24_hour': f"{random.uniform(-8, 8):.3f}",
+            'high': f"{price * 1.05:.8f}",
+            'low': f"{price * 0.95:.8f}",
+            'volume': f"{random.uniform(1e3, 1e7):.4f}",
+            'last_price': f"{price:.8f}",
+            'bid': f"{price * 0.999:.8f}",
+            'ask': f"{price * 1.001:.8f}",
+            'timestamp': int(time.time())
+        })
+    for i in range(extra_markets):
+        tickers.append({'market': f"MOCK{i}USDT", 'last_price': '1.0', 'volume': '1.0', 'high': '1.0', 'low': '1.0',
+                        'change_24_hour': '0.0', 'bid': '1.0', 'ask': '1.0', 'timestamp': int(time.time())})
+    random.shuffle(tickers)
+    return json.dumps(tickers).encode('utf-8')
+
+def legacy_parse(body, coins):
+    ticker_dict = {}
+    for ticker in json.loads(body):
+        if isinstance(ticker, dict):
+            ticker_dict[ticker.get('market', '')] = ticker
+
+    results = {}
+    for coin_symbol in coins:
+        ticker = ticker_dict.get(f"{coin_symbol}INR")
+        if ticker:
+            results[coin_symbol] = {
+                'symbol': coin_symbol,
+                'market': f"{coin_symbol}INR",
+                'price': float(ticker.get('last_price', 0)),
+                'volume': float(ticker.get('volume', 0)),
+                'high': float(ticker.get('high', 0)),
+                'low': float(ticker.get('low', 0)),
+                'change_24h': float(ticker.get('change_24_hour', 0)),
+                'timestamp': datetime.now()
+            }
+    return results
+
+def best_of(fn, repeats=20):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    random.seed(7)
+    coins = load_futures_coins(project_root / 'data' / 'futures-coins-filtered.txt')
+    parser = TickerParser(coins)
+
+    print(f"Watched coins: {len(coins)} | JSON decoder: {JSON_DECODER}")
+    print(f"{'markets':>8} {'size (KB)':>10} {'legacy (ms)':>12} {'parser (ms)':>12} {'speedup':>8}")
+
+    for extra_markets in (500, 2300, 5000):
+        body = build_snapshot(coins, extra_markets)
+
+        expected = legacy_parse(body, coins)
+        snapshot = parser.parse(body)
+        assert snapshot.count == len(expected)
+        assert all(abs(snapshot.price_data(parser.market_index[data['market']])['price'] - data['price']) == 0
+                   for data in expected.values())
+
+        legacy = best_of(lambda: legacy_parse(body, coins))
+        fast = best_of(lambda: parser.parse(body))
+        markets = len(coins) + extra_markets
+        print(f"{markets:>8} {len(body) / 1024:>10.0f} {legacy * 1000:>12.2f} {fast * 1000:>12.2f} {legacy / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
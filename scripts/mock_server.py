@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import argparse
+import gzip
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+class MockState:
+    def __init__(self, coins, extra_markets, latency_ms, webhook_latency_ms=0, webhook_limit=0,
+                 api_key='mock-key', api_secret='mock-secret'):
+        self.lock = threading.Lock()
+        self.latency = latency_ms / 1000
+        self.api_key = api_key
+        self.api_secret = api_secret.encode('utf-8')
+        self.account_requests = 0
+        self.balance = 100000.0
+        self.locked = 0.0
+        self.webhook_latency = webhook_latency_ms / 1000
+        self.webhook_limit = webhook_limit
+        self.webhook_windows = {}
+        self.webhook_messages = {'discord': [], 'telegram': []}
+        self.webhook_rate_limited = {'discord': 0, 'telegram': 0}
+        self.prices = {coin: random.uniform(1, 50000) for coin in coins}
+        self.volumes = {coin: random.uniform(1e3, 1e7) for coin in coins}
+        self.extra_markets = [f"MOCK{i}USDT" for i in range(extra_markets)]
+        self.requests = 0
+        self.connections = 0
+
+    def tickers(self):
+        with self.lock:
+            self.requests += 1
+            timestamp = int(time.time())
+            data = []
+            for coin, price in self.prices.items():
+                price *= 1 + random.gauss(0, 0.003)
+                self.prices[coin] = price
+                self.volumes[coin] *= 1 + abs(random.gauss(0, 0.05))
+                data.append({
+                    'market': f"{coin}INR",
+                    'change_24_hour': f"{random.uniform(-8, 8):.3f}",
+                    'high': f"{price * 1.05:.8f}",
+                    'low': f"{price * 0.95:.8f}",
+                    'volume': f"{self.volumes[coin]:.4f}",
+                    'last_price': f"{price:.8f}",
+                    'bid': f"{price * 0.999:.8f}",
+                    'ask': f"{price * 1.001:.8f}",
+                    'timestamp': timestamp
+                })
+            for market in self.extra_markets:
+                data.append({'market': market, 'last_price': '1.0', 'volume': '1.0', 'timestamp': timestamp})
+            return data
+
+    def accept_webhook(self, channel, payload):
+        # Fixed one-second window per channel; requests beyond webhook_limit get a 429.
+        with self.lock:
+            now = time.time()
+            window_start, count = self.webhook_windows.get(channel, (now, 0))
+            if now - window_start >= 1:
+                window_start, count = now, 0
+            if self.webhook_limit and count >= self.webhook_limit:
+                self.webhook_rate_limited[channel] += 1
+                return round(window_start + 1 - now, 3)
+            self.webhook_windows[channel] = (window_start, count + 1)
+            self.webhook_messages[channel].append(payload)
+            return None
+
+    def verify_signature(self, api_key, signature, body):
+        expected = hmac.new(self.api_secret, body, hashlib.sha256).hexdigest()
+        return api_key == self.api_key and hmac.compare_digest(expected, signature or '')
+
+    def balances(self):
+        with self.lock:
+            self.account_requests += 1
+            return [
+                {'currency': 'INR', 'balance': f"{self.balance:.2f}", 'locked_balance': f"{self.locked:.2f}"},
+                {'currency': 'USDT', 'balance': '0.0', 'locked_balance': '0.0'}
+            ]
+
+    def active_orders(self):
+        with self.lock:
+            self.account_requests += 1
+            coins = list(self.prices)[:2]
+            return [
+                {'id': f"mock-{i}", 'market': f"{coin}INR", 'side': 'buy', 'status': 'open',
+                 'price': self.prices[coin], 'total_quantity': 1.0, 'filled_quantity': 1.0}
+                for i, coin in enumerate(coins)
+            ]
+
+    def webhook_stats(self):
+        with self.lock:
+            return {
+                channel: {'requests': len(messages), 'rate_limited': self.webhook_rate_limited[channel]}
+                for channel, messages in self.webhook_messages.items()
+            }
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    state: MockState = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        time.sleep(self.state.latency)
+        if self.path.startswith('/exchange/ticker'):
+            self._send_json(self.state.tickers())
+        elif self.path.startswith('/webhooks/stats'):
+            self._send_json(self.state.webhook_stats())
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        if self.path.startswith('/exchange/v1/'):
+            self._handle_account()
+            return
+
+        payload = self._read_json()
+        time.sleep(self.state.webhook_latency)
+        if self.path.startswith('/webhooks/discord'):
+            retry_after = self.state.accept_webhook('discord', payload)
+            if retry_after is not None:
+                self._send_json({'message': 'You are being rate limited.', 'retry_after': retry_after},
+                                status=429, headers={'Retry-After': str(retry_after)})
+            else:
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+        elif self.path.startswith('/bot') and self.path.endswith('/sendMessage'):
+            retry_after = self.state.accept_webhook('telegram', payload)
+            if retry_after is not None:
+                self._send_json({'ok': False, 'error_code': 429, 'parameters': {'retry_after': max(1, round(retry_after))}},
+                                status=429)
+            else:
+                self._send_json({'ok': True, 'result': {'chat': {'id': payload.get('chat_id')}, 'text': payload.get('text')}})
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def _handle_account(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.state.latency)
+        if not self.state.verify_signature(self.headers.get('X-AUTH-APIKEY'), self.headers.get('X-AUTH-SIGNATURE'), body):
+            self._send_json({'code': 401, 'message': 'Invalid signature'}, status=401)
+        elif self.path.startswith('/exchange/v1/users/balances'):
+            self._send_json(self.state.balances())
+        elif self.path.startswith('/exchange/v1/orders/active_orders'):
+            self._send_json(self.state.active_orders())
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+def build_server(host='127.0.0.1', port=8765, coins_file='data/futures-coins-filtered.txt',
+                 extra_markets=2000, latency_ms=0, webhook_latency_ms=0, webhook_limit=0):
+    coins_path = project_root / coins_file
+    coins = [line.strip() for line in open(coins_path) if line.strip()]
+    state = MockState(coins, extra_markets, latency_ms, webhook_latency_ms, webhook_limit)
+    handler = type('BoundMockHandler', (MockHandler,), {'state': state})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the CoinDCX ticker API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--coins-file', default='data/futures-coins-filtered.txt')
+    parser.add_argument('--extra-markets', type=int, default=2000, help="Unwatched markets added to each ticker snapshot")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Artificial delay before each ticker/account response")
+    parser.add_argument('--webhook-latency-ms', type=int, default=0, help="Artificial delay before each webhook response")
+    parser.add_argument('--webhook-limit', type=int, default=0, help="Webhook requests per second per channel before 429 (0 = unlimited)")
+    args = parser.parse_args()
+
+    server = build_server(args.host, args.port, args.coins_file, args.extra_markets, args.latency_ms,
+                          args.webhook_latency_ms, args.webhook_limit)
+    base = f"http://{args.host}:{args.port}"
+    print(f"Mock server listening on {base}")
+    print(f"  Ticker:   {base}/exchange/ticker  (set scanner.api_endpoint)")
+    print(f"  Discord:  {base}/webhooks/discord/test  (set DISCORD_WEBHOOK)")
+    print(f"  Telegram: {base}  (set alerts.telegram.api_base)")
+    print(f"  Account:  {base}/exchange/v1/users/balances, /exchange/v1/orders/active_orders  (set personalized.api_endpoint;")
+    print(f"            COINDCX_API_KEY=mock-key COINDCX_API_SECRET=mock-secret)")
+    print(f"  Stats:    {base}/webhooks/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
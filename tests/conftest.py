@@ -0,0 +1,32 @@
+import importlib.util
+import threading
+from pathlib import Path
+
+import pytest
+
+MOCK_SERVER_PATH = Path(__file__).resolve().parent.parent / 'scripts' / 'mock_server.py'
+
+def load_mock_server():
+    spec = importlib.util.spec_from_file_location('mock_server', MOCK_SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def mock_server():
+    # Factory starting scripts/mock_server.py on a free port; returns (base_url, state).
+    module = load_mock_server()
+    servers = []
+
+    def start(**options):
+        options.setdefault('extra_markets', 20)
+        server = module.build_server(port=0, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}", server.RequestHandlerClass.state
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,111 @@
+import hashlib
+import hmac
+import json
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from app.account_manager import AccountManager
+from app.margin_ledger import MarginLedger
+
+ROOT = Path(__file__).resolve().parent.parent
+
+@pytest.fixture
+def manager_factory():
+    managers = []
+
+    def build(base_url, api_key='mock-key', api_secret='mock-secret'):
+        with open(ROOT / 'config' / 'config.yaml') as f:
+            config = yaml.safe_load(f)
+        config['personalized']['api_endpoint'] = base_url
+        manager = AccountManager(config, api_key, api_secret)
+        managers.append(manager)
+        return manager
+
+    yield build
+    for manager in managers:
+        manager._executor.shutdown(wait=True)
+        manager.session.close()
+
+def test_refresh_fetches_both_endpoints_concurrently_over_one_session(mock_server, manager_factory):
+    base_url, state = mock_server(latency_ms=300)
+    manager = manager_factory(base_url)
+
+    for _ in range(3):
+        started = time.perf_counter()
+        manager.refresh_account_data()
+        assert time.perf_counter() - started < 0.55
+
+    assert state.account_requests == 6
+    assert state.connections == 2
+    assert manager.refresh_count == 3 and not manager.stale
+    assert manager.account_balance['total_balance'] > 0
+    assert len(manager.open_positions) == 2
+    assert manager.last_refresh_ms < 550
+
+def test_cached_signer_matches_fresh_hmac(mock_server, manager_factory):
+    base_url, _ = mock_server()
+    manager = manager_factory(base_url)
+    payload = json.dumps({'timestamp': 1700000000000}, separators=(',', ':'))
+
+    signer = manager._signer.copy()
+    signer.update(payload.encode('utf-8'))
+
+    expected = hmac.new(b'mock-secret', payload.encode('utf-8'), hashlib.sha256).hexdigest()
+    assert signer.hexdigest() == expected == manager._generate_signature('mock-secret', payload)
+    # The cached signer is copied per request, so it still signs the next payload from scratch.
+    assert manager._signer.copy().hexdigest() == hmac.new(b'mock-secret', b'', hashlib.sha256).hexdigest()
+
+def test_refresh_with_wrong_secret_is_rejected(mock_server, manager_factory):
+    base_url, state = mock_server()
+    manager = manager_factory(base_url, api_secret='wrong-secret')
+
+    manager.refresh_account_data()
+
+    assert state.account_requests == 0
+    assert manager.stale and manager.refresh_count == 0
+    assert manager.account_balance == {}
+
+def test_margin_lookup_never_fetches_inline(mock_server, manager_factory):
+    base_url, state = mock_server()
+    manager = manager_factory(base_url)
+
+    assert manager.get_available_margin() == 0
+    assert manager.get_used_margin() == 0
+    assert manager.can_open_position(100)[0] is False
+    assert state.account_requests == 0
+
+    manager.refresh_account_data()
+    manager.reserve_margin('BTC', 'LONG', 1000)
+    available = manager.get_available_margin()
+    assert available == manager.account_balance['available_margin'] - 1000
+    assert state.account_requests == 2
+
+def test_reconcile_matches_side_and_order_time():
+    ledger = MarginLedger(ttl_seconds=120)
+    ledger.reserve('BTC', 'LONG', 100)
+    ledger.reserve('ETH', 'SHORT', 200)
+    reserved_at = ledger.reservations['ETH_SHORT']['reserved_at']
+
+    ledger.reconcile([('BTC', 'SHORT', None), ('ETH', 'SHORT', reserved_at - 60)])
+    assert sorted(ledger.reservations) == ['BTC_LONG', 'ETH_SHORT']
+
+    ledger.reconcile([('BTC', 'LONG', None), ('ETH', 'SHORT', reserved_at - 60), ('ETH', 'SHORT', reserved_at + 1)])
+    assert ledger.reservations == {}
+    assert ledger.reconciled == 2 and ledger.expired == 0
+
+def test_parse_positions_reads_side_and_order_time(mock_server, manager_factory):
+    base_url, _ = mock_server()
+    manager = manager_factory(base_url)
+
+    positions = manager._parse_positions([
+        {'market': 'BTCINR', 'side': 'buy', 'created_at': 1700000000000},
+        {'market': 'ETHINR', 'side': 'sell', 'created_at': '2023-11-14T22:13:20.000Z'},
+        {'market': 'SOLINR', 'side': 'sell'}
+    ])
+
+    assert [(p['symbol'], p['direction'], p['created_at']) for p in positions] == [
+        ('BTC', 'LONG', 1700000000.0), ('ETH', 'SHORT', 1700000000.0), ('SOL', 'SHORT', None)
+    ]
@@ -0,0 +1,155 @@
+import time
+
+import pytest
+
+from app.alert_channels import DiscordChannel
+from app.alerter import Alerter
+
+def discord_channel(monkeypatch, url='http://127.0.0.1:9/webhooks/discord/test', **config):
+    monkeypatch.setenv('TEST_DISCORD_WEBHOOK', url)
+    return DiscordChannel({'enabled': True, 'webhook_env_var': 'TEST_DISCORD_WEBHOOK', **config})
+
+def test_discord_long_single_message_is_sent_as_embed(monkeypatch):
+    channel = discord_channel(monkeypatch)
+
+    _, short = channel.build_request(['x' * 2000])
+    _, long = channel.build_request(['x' * 3000])
+
+    assert short == {'content': 'x' * 2000}
+    assert long == {'embeds': [{'description': 'x' * 3000}]}
+    assert [len(chunk) for chunk in channel.chunk(['x' * 3000])] == [1]
+
+def alert_config(base_url, queue=False, outbox_file=None, **channel_config):
+    return {
+        'alerts': {
+            'discord': {'enabled': True, 'webhook_env_var': 'TEST_DISCORD_WEBHOOK', **channel_config},
+            'telegram': {'enabled': True, 'bot_token_env_var': 'TEST_TELEGRAM_TOKEN', 'chat_id_env_var': 'TEST_TELEGRAM_CHAT',
+                         'api_base': base_url, **channel_config},
+            'batching': {'enabled': True},
+            'max_retries': 3,
+            'timeout_seconds': 5,
+            'queue': {'enabled': queue, 'drain_timeout_seconds': 10},
+            'outbox': {'enabled': outbox_file is not None, 'file': outbox_file}
+        }
+    }
+
+@pytest.fixture
+def channel_env(monkeypatch):
+    def configure(base_url):
+        monkeypatch.setenv('TEST_DISCORD_WEBHOOK', f"{base_url}/webhooks/discord/test")
+        monkeypatch.setenv('TEST_TELEGRAM_TOKEN', 'test-token')
+        monkeypatch.setenv('TEST_TELEGRAM_CHAT', '42')
+    return configure
+
+@pytest.mark.parametrize('queue', [False, True])
+def test_alerts_fan_out_to_both_channels_in_parallel(mock_server, channel_env, queue):
+    base_url, state = mock_server(webhook_latency_ms=400)
+    channel_env(base_url)
+    alerter = Alerter(alert_config(base_url, queue=queue))
+    assert sorted(alerter.channel_index) == ['discord', 'telegram']
+
+    started = time.perf_counter()
+    alerter.send_error_alert("fan-out check")
+    alerter.close()
+    elapsed = time.perf_counter() - started
+
+    assert len(state.webhook_messages['discord']) == 1
+    assert len(state.webhook_messages['telegram']) == 1
+    assert 'fan-out check' in state.webhook_messages['telegram'][0]['text']
+    assert elapsed < 0.7
+
+def test_channel_counters_track_success_failure_and_latency(mock_server, channel_env):
+    base_url, _ = mock_server(webhook_latency_ms=50)
+    channel_env(base_url)
+    alerter = Alerter(alert_config(base_url))
+    discord = alerter.channel_index['discord']
+    telegram = alerter.channel_index['telegram']
+
+    assert discord.send(['first'])
+    assert discord.send(['second'])
+    telegram.api_base = f"{base_url}/missing"
+    assert not telegram.send(['lost'])
+    alerter.close()
+
+    discord_stats = discord.stats()
+    assert discord_stats['sent'] == 2 and discord_stats['failed'] == 0
+    assert discord_stats['success_rate'] == 1.0
+    assert discord_stats['avg_latency_ms'] >= 50
+    assert discord_stats['max_latency_ms'] >= discord_stats['avg_latency_ms']
+    telegram_stats = telegram.stats()
+    assert telegram_stats['sent'] == 0 and telegram_stats['failed'] == 1
+    assert telegram_stats['success_rate'] == 0.0
+
+def test_post_waits_for_retry_after_on_429(mock_server, monkeypatch):
+    base_url, state = mock_server(webhook_limit=1)
+    channel = discord_channel(monkeypatch, f"{base_url}/webhooks/discord/test",
+                              rate_limit={'requests_per_minute': 6000, 'burst': 10})
+
+    started = time.perf_counter()
+    assert channel.send(['one'])
+    assert channel.send(['two'])
+    elapsed = time.perf_counter() - started
+
+    assert state.webhook_rate_limited['discord'] >= 1
+    assert [payload['content'] for payload in state.webhook_messages['discord']] == ['one', 'two']
+    assert channel.bucket.deferrals >= 1
+    assert elapsed >= 0.5
+    assert channel.stats()['sent'] == 2
+
+def test_post_gives_up_after_max_retries(mock_server, monkeypatch):
+    base_url, state = mock_server(webhook_limit=1)
+    channel = discord_channel(monkeypatch, f"{base_url}/webhooks/discord/test",
+                              rate_limit={'requests_per_minute': 6000, 'burst': 10})
+    channel.max_retries = 0
+
+    assert channel.send(['one'])
+    assert not channel.send(['two'])
+    assert state.webhook_rate_limited['discord'] == 1
+    assert channel.stats()['failed'] == 1
+
+def wait_for_counts(outbox, expected, timeout=5):
+    deadline = time.monotonic() + timeout
+    while outbox.counts() != expected and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return outbox.counts()
+
+@pytest.mark.parametrize('queue', [False, True])
+def test_failed_alerts_are_retried_while_running(mock_server, channel_env, tmp_path, queue):
+    base_url, state = mock_server(webhook_limit=1, webhook_latency_ms=100)
+    channel_env(base_url)
+    config = alert_config(base_url, queue=queue, outbox_file=str(tmp_path / 'outbox.db'),
+                          rate_limit={'requests_per_minute': 6000, 'burst': 10})
+    config['alerts']['max_retries'] = 0
+    config['alerts']['outbox']['retry_interval_seconds'] = 0
+    alerter = Alerter(config)
+
+    alerter.send_error_alert("first")
+    alerter.send_error_alert("second")
+    if queue:
+        # Deliveries still waiting in the queue are not resent.
+        assert alerter.retry_pending() == 0
+    assert wait_for_counts(alerter.outbox, {'delivered': 2, 'pending': 2}) == {'delivered': 2, 'pending': 2}
+
+    time.sleep(1.1)
+    assert alerter.retry_pending() == 2
+    assert wait_for_counts(alerter.outbox, {'delivered': 4}) == {'delivered': 4}
+    alerter.close()
+
+    assert 'second' in state.webhook_messages['telegram'][-1]['text']
+    assert len(state.webhook_messages['discord']) == 2
+
+def test_outbox_is_committed_once_per_cycle(mock_server, channel_env, tmp_path):
+    base_url, _ = mock_server()
+    channel_env(base_url)
+    alerter = Alerter(alert_config(base_url, outbox_file=str(tmp_path / 'outbox.db')))
+
+    alerter.send_error_alert("unbatched one")
+    alerter.send_error_alert("unbatched two")
+    assert alerter.outbox.commits == 0
+
+    alerter.begin_batch()
+    alerter.send_error_alert("batched")
+    alerter.flush_batch()
+    assert alerter.outbox.commits == 1
+    assert alerter.outbox.counts() == {'delivered': 6}
+    alerter.close()
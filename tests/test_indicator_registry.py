@@ -0,0 +1,51 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from app.indicators import TechnicalIndicators
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'config.yaml'
+
+@pytest.fixture
+def config():
+    with open(CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+    config = copy.deepcopy(config)
+    config['signals']['indicators']['plugins'] = ['atr', 'vwap', 'stochastic']
+    return config
+
+def test_vwap_with_longer_price_history(config):
+    rng = np.random.default_rng(7)
+    prices = 100 + np.cumsum(rng.normal(0, 0.5, 30))
+    volumes = rng.uniform(1000, 5000, 20)
+    indicators = TechnicalIndicators(config)
+
+    results = indicators.analyze_universe(prices.reshape(1, -1), volumes.reshape(1, -1))
+
+    period = config['signals']['indicators'].get('vwap_period', 20)
+    expected = (prices[-period:] * volumes[-period:]).sum() / volumes[-period:].sum()
+    assert results['vwap'][0] == pytest.approx(expected)
+    assert results['vwap_distance'][0] == pytest.approx((prices[-1] - expected) / expected * 100)
+
+def test_analyze_coin_with_unequal_histories(config):
+    rng = np.random.default_rng(11)
+    prices = list(100 + np.cumsum(rng.normal(0, 0.5, 30)))
+    volumes = list(rng.uniform(1000, 5000, 20))
+    indicators = TechnicalIndicators(config)
+
+    analysis = indicators.analyze_coin(prices, volumes[-1], volumes)
+
+    assert analysis['has_data']
+    for field in ('atr', 'atr_percent', 'vwap', 'vwap_distance', 'stoch_k', 'stoch_d'):
+        assert isinstance(analysis[field], float)
+
+def test_to_analysis_reports_missing_plugin_fields_as_none(config):
+    indicators = TechnicalIndicators(config)
+
+    analysis = indicators.analyze_coin([100.0, 101.0, 100.5], 1000.0, [900.0, 1000.0])
+
+    assert analysis['vwap'] is None
+    assert analysis['stoch_k'] is None
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from app.indicator_core import ema_filter
+from app.indicators import TechnicalIndicators
+from app.price_store import PriceStore
+from app.streaming_indicators import StreamingIndicators
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'config.yaml'
+
+@pytest.fixture
+def config():
+    with open(CONFIG_PATH) as f:
+        return yaml.safe_load(f)
+
+def test_ema_of_flat_series_is_exact():
+    for length in (20, 300):
+        values = np.full((3, length), 1234.567)
+        assert np.array_equal(ema_filter(values, 12), values)
+
+@pytest.mark.parametrize('coins', [1, 7, 500, 4000])
+def test_flat_series_has_no_macd_crossover(config, coins):
+    levels = np.linspace(0.01, 50000, coins)
+    prices = np.repeat(levels[:, None], 20, axis=1)
+    results = TechnicalIndicators(config).analyze_universe(prices, np.ones((coins, 20)))
+
+    assert np.array_equal(results['macd'], np.zeros(coins))
+    assert np.array_equal(results['macd_histogram'], np.zeros(coins))
+    assert not results['bullish_crossover'].any()
+    assert not results['bearish_crossover'].any()
+
+def test_flat_series_has_no_streaming_macd_crossover(config):
+    coins = 50
+    store = PriceStore(capacity=40)
+    rows = store.rows_for([f"COIN{i}" for i in range(coins)])
+    streaming = StreamingIndicators(config, store, volume_window=20)
+    levels = np.linspace(0.01, 50000, coins)
+    for tick in range(25):
+        store.append_many(rows, levels, np.ones(coins), tick * 1000)
+        streaming.update(rows)
+
+    results = streaming.analyze_rows(rows)
+    assert np.array_equal(results['macd_histogram'], np.zeros(coins))
+    assert not (results['bullish_crossover'] | results['bearish_crossover']).any()
@@ -0,0 +1,76 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from app.scanner import PriceScanner
+from app.universe import CoinUniverse
+
+ROOT = Path(__file__).resolve().parent.parent
+
+@pytest.fixture
+def scanner_factory():
+    def build(base_url, checkpoint=None, **performance):
+        with open(ROOT / 'config' / 'config.yaml') as f:
+            config = yaml.safe_load(f)
+        config['scanner']['api_endpoint'] = f"{base_url}/exchange/ticker"
+        config['scanner']['history_checkpoint'] = checkpoint or {'enabled': False}
+        config['performance'].update(performance)
+        return PriceScanner(config)
+    return build
+
+@pytest.fixture
+def universe():
+    return CoinUniverse(str(ROOT / 'data' / 'futures-coins-filtered.txt'))
+
+def test_snapshots_reuse_one_gzip_keep_alive_connection(mock_server, scanner_factory, universe):
+    base_url, state = mock_server()
+    scanner = scanner_factory(base_url)
+
+    snapshots = [scanner.fetch_snapshot(universe) for _ in range(3)]
+
+    assert all(snapshot is not None and snapshot.count == len(universe.coins) for snapshot in snapshots)
+    assert state.requests == 3
+    assert state.connections == 1
+    stats = scanner.last_fetch_stats
+    assert stats['encoding'] == 'gzip'
+    assert 0 < stats['wire_bytes'] < stats['body_bytes']
+    assert stats['ttfb_ms'] > 0 and stats['download_ms'] >= 0 and stats['parse_ms'] > 0
+
+def test_connect_and_read_timeouts_are_separate(mock_server, scanner_factory, universe):
+    base_url, _ = mock_server(latency_ms=500)
+    scanner = scanner_factory(base_url, api_timeout_seconds=0.2, connect_timeout_seconds=2, max_api_retries=1)
+    assert scanner.timeout == (2, 0.2)
+
+    started = time.perf_counter()
+    snapshot = scanner.fetch_snapshot(universe)
+
+    assert snapshot is None
+    assert time.perf_counter() - started < 0.45
+
+def test_slow_response_within_read_timeout_succeeds(mock_server, scanner_factory, universe):
+    base_url, _ = mock_server(latency_ms=200)
+    scanner = scanner_factory(base_url, api_timeout_seconds=2, connect_timeout_seconds=0.1, max_api_retries=1)
+
+    assert scanner.fetch_snapshot(universe) is not None
+    assert scanner.last_fetch_stats['ttfb_ms'] >= 200
+
+def test_checkpoint_copies_history_before_writing_in_background(mock_server, scanner_factory, universe, tmp_path):
+    base_url, _ = mock_server()
+    scanner = scanner_factory(base_url, checkpoint={'enabled': True, 'file': str(tmp_path / 'history.npz'), 'interval_seconds': 0})
+
+    scanner.fetch_snapshot(universe)
+    assert scanner.checkpoint_if_due()
+    scanner.fetch_snapshot(universe)
+    scanner._pending_checkpoint.result()
+
+    with np.load(scanner.checkpoint_file) as saved:
+        assert saved['counts'].max() == 1
+    assert scanner.store.counts[:scanner.store.size].max() == 2
+
+    assert scanner.save_history_checkpoint()
+    with np.load(scanner.checkpoint_file) as saved:
+        assert saved['counts'].max() == 2
+    scanner._checkpoint_writer.shutdown()
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from app.indicators import TechnicalIndicators
+from app.prescreen import PreScreen
+from app.price_store import PriceStore
+from app.streaming_indicators import StreamingIndicators
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'config.yaml'
+
+FIELDS = ('rsi', 'macd', 'macd_signal', 'macd_histogram', 'bb_upper', 'bb_middle', 'bb_lower',
+          'bb_position', 'volume_multiplier', 'momentum_change')
+
+FLAGS = ('bullish_crossover', 'bearish_crossover', 'bb_at_lower', 'bb_at_upper', 'volume_surge', 'has_data')
+
+@pytest.fixture
+def config():
+    with open(CONFIG_PATH) as f:
+        return yaml.safe_load(f)
+
+def test_streaming_matches_batch_on_random_walk(config):
+    rng = np.random.default_rng(3)
+    coins = 200
+    store = PriceStore(capacity=100)
+    rows = store.rows_for([f"COIN{i}" for i in range(coins)])
+    streaming = StreamingIndicators(config, store, volume_window=20)
+    batch = TechnicalIndicators(config)
+
+    prices = np.full(coins, 100.0)
+    crossovers = 0
+    for tick in range(250):
+        prices = prices * (1 + rng.normal(0, 0.01, coins))
+        store.append_many(rows, prices, rng.uniform(1000, 3000, coins), tick * 1000)
+        streaming.update(rows)
+        if tick < 19 or tick % 7:
+            continue
+
+        streamed = streaming.analyze_rows(rows)
+        expected = batch.analyze_universe(store.window_matrix(rows, 20), store.window_matrix(rows, 20, 'volumes'))
+        for field in FIELDS:
+            np.testing.assert_allclose(streamed[field], expected[field], rtol=1e-7, atol=1e-9, err_msg=field)
+        for field in FLAGS:
+            np.testing.assert_array_equal(streamed[field], expected[field], err_msg=field)
+        crossovers += int(expected['bullish_crossover'].sum() + expected['bearish_crossover'].sum())
+
+    assert crossovers > 0
+
+def test_streaming_prescreen_matches_batch(config):
+    rng = np.random.default_rng(5)
+    coins = 300
+    store = PriceStore(capacity=100)
+    rows = store.rows_for([f"COIN{i}" for i in range(coins)])
+    streaming = StreamingIndicators(config, store, volume_window=20)
+    screen = PreScreen(config)
+
+    prices = np.full(coins, 100.0)
+    pruned = 0
+    for tick in range(120):
+        prices = prices * (1 + rng.normal(0, 0.002, coins))
+        store.append_many(rows, prices, rng.uniform(1000, 1500, coins), tick * 1000)
+        streaming.update(rows)
+        if tick < 19:
+            continue
+
+        streamed = screen.screen_streaming(streaming, rows)
+        expected = screen.screen(store.window_matrix(rows, 20), store.window_matrix(rows, 20, 'volumes'))
+        np.testing.assert_array_equal(streamed, expected)
+        pruned += int((~expected).sum())
+
+    assert pruned > 0